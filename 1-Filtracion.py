@@ -1,53 +1,51 @@
-import re
 import json
+from archivos import escritura_atomica
+from cabeceras import LectorCabeceras, TablaMetadatos
+from configuracion import cargar_configuracion
+from filtros import compilar_filtros, cumple, fraccion_N
 
-# Cargar configuración desde 'parametros.json'
-with open("parametros.json", "r") as config_file:
-    config = json.load(config_file)
-
-# Parámetros desde JSON
-ARCHIVO_ENTRADA = config["filtro"]["archivo_entrada"]
-ARCHIVO_SALIDA = config["filtro"]["archivo_salida"]
-ARCHIVO_SALIDA_N = config["filtro"].get("archivo_salida_N", "secuencias_con_N.fasta")
-AÑO = config["filtro"]["periodo"]
-MES = config["filtro"].get("mes")  # Puede ser null → None
-
-def extraer_fecha(cabecera: str) -> str | None:
-    """
-    Extrae la fecha desde un campo delimitado por '|' en la cabecera FASTA.
-    Acepta YYYY, YYYY-MM, YYYY-MM-DD con separador '-' o '/'.
-    Devuelve 'YYYY-MM-DD' normalizado (rellena con 00 lo que falte).
-    """
-    campos = [c.strip() for c in cabecera.split('|')]
-    patron = re.compile(r'^\d{4}(?:[-/]\d{1,2}){0,2}$')  # regex para fecha
-
-    for campo in campos:
-        if patron.fullmatch(campo):
-            partes = re.split(r'[-/]', campo)
-            año = partes[0]
-            mes = partes[1].zfill(2) if len(partes) > 1 else '00'
-            dia = partes[2].zfill(2) if len(partes) > 2 else '00'
-            return f"{año}-{mes}-{dia}"
-    return None
-
-def validar_fecha(fecha: str, año: int, mes: int | None) -> bool:
+def procesar_archivo(archivo_entrada: str, año: int | None, mes: int | None,
+                     lector: LectorCabeceras | None = None,
+                     metadatos: TablaMetadatos | None = None,
+                     criterios: dict | None = None,
+                     max_fraccion_N: float = 0.0) -> tuple[dict, dict]:
     """
-    Verifica si la fecha normalizada cumple el filtro.
-    fecha siempre llega como 'YYYY-MM-DD'.
+    Filtra secuencias por fecha (y 'criterios' adicionales) y separa por
+    fracción de ambigüedades (N), en un solo recorrido del archivo.
+    Las secuencias con fracción de N <= max_fraccion_N van al análisis (sus N
+    se tratan luego como dato faltante); el resto va al archivo de secuencias con N.
+    Los criterios de cabecera se evalúan al leer la cabecera, de modo que las
+    secuencias descartadas ni siquiera se acumulan.
+    Si se entrega 'metadatos', agrega en el mismo recorrido una fila con los
+    campos de la cabecera de cada secuencia del archivo, incluidas las
+    descartadas (destino 'descartada').
     """
-    partes = fecha.split('-')
-    año_seq, mes_seq = int(partes[0]), int(partes[1])  # esto cambia "04" → 4
-    if año_seq != año:
-        return False
-    if mes is None:  # Todos los meses
-        return True
-    return mes_seq == mes
-
-def procesar_archivo(archivo_entrada: str, año: int, mes: int | None) -> tuple[dict, dict]:
-    """Filtra secuencias por fecha y separa por presencia de ambigüedades (N)."""
+    lector = lector or LectorCabeceras()
+    filtros_cabecera, filtros_secuencia = compilar_filtros(año, mes, criterios)
     secuencias_filtradas = {}
     secuencias_con_N = {}
-    etiqueta_actual, fecha_actual, secuencia_actual = None, None, []
+    etiqueta_actual, campos_actuales, secuencia_actual = None, None, []
+
+    def registrar(etiqueta, campos, destino, fraccion=None):
+        if metadatos is not None:
+            metadatos.agregar({**campos, "id": etiqueta[1:], "destino": destino,
+                               "fraccion_N": f"{fraccion:.4f}" if fraccion is not None else ""})
+
+    def guardar_actual():
+        if not etiqueta_actual:
+            return
+        secuencia_completa = ''.join(secuencia_actual)
+        fraccion = fraccion_N(secuencia_completa)
+        if not cumple(filtros_secuencia, secuencia_completa):
+            registrar(etiqueta_actual, campos_actuales, "descartada", fraccion)
+            return
+        if fraccion > max_fraccion_N:
+            secuencias_con_N[etiqueta_actual] = secuencia_completa
+            destino = "con_N"
+        else:
+            secuencias_filtradas[etiqueta_actual] = secuencia_completa
+            destino = "filtrada"
+        registrar(etiqueta_actual, campos_actuales, destino, fraccion)
 
     with open(archivo_entrada, 'r') as archivo:
         for linea in archivo:
@@ -57,17 +55,15 @@ def procesar_archivo(archivo_entrada: str, año: int, mes: int | None) -> tuple[
 
             if linea.startswith('>'):  # Cabecera FASTA
                 # Guardar secuencia previa
-                if etiqueta_actual and fecha_actual:
-                    secuencia_completa = ''.join(secuencia_actual)
-                    if validar_fecha(fecha_actual, año, mes):
-                        if 'N' in secuencia_completa:
-                            secuencias_con_N[etiqueta_actual] = secuencia_completa
-                        else:
-                            secuencias_filtradas[etiqueta_actual] = secuencia_completa
-
-                # Nueva cabecera
+                guardar_actual()
+
+                # Nueva cabecera (None si no pasa los filtros de cabecera)
                 etiqueta_actual = linea.split()[0]
-                fecha_actual = extraer_fecha(linea)
+                campos_actuales = lector.leer(linea)
+                if not cumple(filtros_cabecera, etiqueta_actual, campos_actuales):
+                    # La secuencia no se acumula: su fila va sin fracción de N
+                    registrar(etiqueta_actual, campos_actuales, "descartada")
+                    etiqueta_actual = None
                 secuencia_actual = []
 
             else:
@@ -75,39 +71,56 @@ def procesar_archivo(archivo_entrada: str, año: int, mes: int | None) -> tuple[
                     secuencia_actual.append(linea)
 
         # Procesar última secuencia
-        if etiqueta_actual and fecha_actual:
-            secuencia_completa = ''.join(secuencia_actual)
-            if validar_fecha(fecha_actual, año, mes):
-                if 'N' in secuencia_completa:
-                    secuencias_con_N[etiqueta_actual] = secuencia_completa
-                else:
-                    secuencias_filtradas[etiqueta_actual] = secuencia_completa
+        guardar_actual()
 
     return secuencias_filtradas, secuencias_con_N
 
 def guardar_secuencias(secuencias: dict, archivo_salida: str):
     """Guarda secuencias en formato FASTA."""
-    with open(archivo_salida, "w") as file:
+    with escritura_atomica(archivo_salida) as file:
         for etiqueta, secuencia in secuencias.items():
             file.write(f"{etiqueta}\n{secuencia}\n")
 
+def ejecutar_filtrado(config):
+    """Etapa 1: filtra el FASTA de entrada según la sección 'filtro'."""
+    archivo_entrada = config["filtro"]["archivo_entrada"]
+    archivo_salida = config["filtro"]["archivo_salida"]
+    archivo_salida_N = config["filtro"].get("archivo_salida_N", "secuencias_con_N.fasta")
+    año = config["filtro"]["periodo"]  # Puede ser null si se usan 'criterios' de fecha
+    mes = config["filtro"].get("mes")  # Puede ser null → None
+
+    archivo_metadatos = config["filtro"].get("archivo_metadatos")
+
+    lector = LectorCabeceras.desde_config(config)
+    max_fraccion_N = config["filtro"].get("max_fraccion_N", 0.0)
+    metadatos = TablaMetadatos(lector.columnas() + ["fraccion_N", "destino"]) if archivo_metadatos else None
+
+    mes_str = f", Mes: {mes}" if mes else ", Todos los meses"
+    año_str = f"Año: {año}" if año is not None else "Todos los años"
+    print(f"🔹 Filtrando secuencias de {archivo_entrada} ({año_str}{mes_str})...")
+    secuencias, secuencias_N = procesar_archivo(
+        archivo_entrada, año, mes, lector, metadatos, config["filtro"].get("criterios"), max_fraccion_N
+    )
+
+    guardar_secuencias(secuencias, archivo_salida)
+    print(f"✅ Secuencias con fracción de N <= {max_fraccion_N} guardadas en '{archivo_salida}'. {len(secuencias)} secuencias")
+
+    guardar_secuencias(secuencias_N, archivo_salida_N)
+    print(f"✅ Secuencias con fracción de N > {max_fraccion_N} guardadas en '{archivo_salida_N}'. {len(secuencias_N)} secuencias")
+
+    if metadatos is not None:
+        metadatos.guardar_csv(archivo_metadatos)
+        print(f"✅ Metadatos de cabeceras guardados en '{archivo_metadatos}'. {len(metadatos)} filas")
+
+    # Mensaje resumen
+    print(f"📊 Total de secuencias procesadas: {len(secuencias) + len(secuencias_N)}")
+    return True
+
 if __name__ == "__main__":
     try:
-        mes_str = f", Mes: {MES}" if MES else ", Todos los meses"
-        print(f"🔹 Filtrando secuencias de {ARCHIVO_ENTRADA} (Año: {AÑO}{mes_str})...")
-        secuencias, secuencias_N = procesar_archivo(ARCHIVO_ENTRADA, AÑO, MES)
-        
-        guardar_secuencias(secuencias, ARCHIVO_SALIDA)
-        print(f"✅ Secuencias sin N guardadas en '{ARCHIVO_SALIDA}'. {len(secuencias)} secuencias")
-        
-        guardar_secuencias(secuencias_N, ARCHIVO_SALIDA_N)
-        print(f"✅ Secuencias con N guardadas en '{ARCHIVO_SALIDA_N}'. {len(secuencias_N)} secuencias")
-        
-        # Mensaje resumen
-        print(f"📊 Total de secuencias procesadas: {len(secuencias) + len(secuencias_N)}")
-        
-    except FileNotFoundError:
-        print(f"❌ Error: No se encontró el archivo '{ARCHIVO_ENTRADA}' o 'parametros.json'.")
+        ejecutar_filtrado(cargar_configuracion())
+    except FileNotFoundError as e:
+        print(f"❌ Error: No se encontró el archivo '{e.filename}'.")
     except json.JSONDecodeError:
         print("❌ Error: 'parametros.json' tiene un formato inválido.")
     except KeyError as e:
@@ -1,32 +1,20 @@
-import subprocess
+import asyncio
 import json
+import shlex
 import sys
 import random
-from Bio import AlignIO, SeqIO
 from statistics import mode, StatisticsError
+from pathlib import Path
+from archivos import escritura_atomica, publicar_si, ruta_atomica, ruta_temporal
+from configuracion import cargar_configuracion
+from herramientas import ejecutar_herramienta, mostrar_progreso
 
 # CARGA DE CONFIGURACIÓN
 
-def cargar_configuracion():
-    """Carga y valida la configuración desde parametros.json."""
+def obtener_configuracion():
+    """Carga y valida la configuración desde parametros.json (termina si es inválida)."""
     try:
-        with open("parametros.json", "r", encoding="utf-8") as archivo:
-            configuracion = json.load(archivo)
-
-        claves_requeridas = {
-            "filtro": ["archivo_salida"],
-            "mafft": ["hilos", "ep", "op", "salida"],
-            "ugene": ["umbral", "formato", "archivo_salida"],
-            "biopython_consensus": ["umbral", "habilitado", "archivo_salida"]
-        }
-        
-        for seccion, claves in claves_requeridas.items():
-            if not all(clave in configuracion.get(seccion, {}) for clave in claves):
-                faltantes = [c for c in claves if c not in configuracion[seccion]]
-                raise KeyError(f"Faltan claves en 'parametros.json': {faltantes}")
-
-        return configuracion
-
+        return cargar_configuracion()
     except FileNotFoundError:
         print("❌ Error: Archivo 'parametros.json' no encontrado.")
         sys.exit(1)
@@ -40,30 +28,68 @@ def cargar_configuracion():
 # -------------------------------------------------
 # EJECUCIÓN DE COMANDOS
 # -------------------------------------------------
-def ejecutar_comando(comando):
-    """Ejecuta un comando en la terminal y maneja errores."""
-    try:
-        print(f"🔹 Ejecutando: {comando}")
-        subprocess.run(comando, check=True, shell=True, capture_output=True, text=True)
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Error al ejecutar: {e}")
-        print(f"   Stderr: {e.stderr}")
-        return False
-
-def ejecutar_comando_ugene(config, archivo_entrada):
-    """Ejecuta UGENE con algoritmo de consenso."""
-    salida_ugene = config["ugene"]["archivo_salida"]
+def ejecutar_comando(argv, nombre, config, seccion):
+    """Ejecuta una herramienta externa y espera a que termine."""
+    return asyncio.run(ejecutar_herramienta_configurada(argv, nombre, config, seccion))
+
+async def ejecutar_herramienta_configurada(argv, nombre, config, seccion):
+    """Ejecuta una herramienta con el tiempo límite de su sección y registros en disco."""
+    return await ejecutar_herramienta(
+        argv, nombre,
+        directorio_registros=config.get("registros", {}).get("directorio", "registros"),
+        timeout=config[seccion].get("timeout"),
+        al_progresar=mostrar_progreso
+    )
 
-    comando = (
-        f'ugene --task=extract_consensus_sequence '
-        f'--in={archivo_entrada} '
-        f'--out={salida_ugene} '
-        f'--format={config["ugene"]["formato"]} '
-        f'--keep-gaps={str(config["ugene"].get("mantener_gaps", False)).lower()} '
+def comando_mafft(config, archivo_entrada, archivo_salida):
+    """Argumentos de MAFFT. Puede reemplazar en parametros "auto" por "genafpair", "localpair" o "globalpair"."""
+    return [
+        'mafft', f'--{config["mafft"]["metodo"]}',
+        '--ep', str(config["mafft"]["ep"]),
+        *shlex.split(config["mafft"].get("opcionales", "")),
+        '--op', str(config["mafft"]["op"]),
+        '--thread', str(config["mafft"]["hilos"]),
+        '--out', archivo_salida,
+        archivo_entrada
+    ]
+
+def comando_ugene(config, archivo_entrada, archivo_salida):
+    """Argumentos de UGENE con algoritmo de consenso."""
+    return [
+        'ugene', '--task=extract_consensus_sequence',
+        f'--in={archivo_entrada}',
+        f'--out={archivo_salida}',
+        f'--format={config["ugene"]["formato"]}',
+        f'--keep-gaps={str(config["ugene"].get("mantener_gaps", False)).lower()}',
         f'--threshold={config["ugene"]["umbral"]}'
+    ]
+
+async def ejecutar_ugene(config, archivo_entrada):
+    """UGENE escribe en un temporal que solo se publica si termina bien."""
+    salida = config["ugene"]["archivo_salida"]
+    temporal = ruta_temporal(salida)
+    ok = await ejecutar_herramienta_configurada(
+        comando_ugene(config, archivo_entrada, temporal), "ugene", config, "ugene"
     )
-    return ejecutar_comando(comando)
+    return publicar_si(ok, temporal, salida)
+
+async def generar_consensos(config, archivo_entrada, alineamiento):
+    """
+    Ejecuta en paralelo el consenso UGENE (proceso externo, sobre el FASTA
+    recortado) y el consenso Levitsky (en un hilo, sobre el alineamiento en
+    memoria). Devuelve (consenso_ugene_ok, consenso_levitsky_ok).
+    """
+    tarea_ugene = ejecutar_ugene(config, archivo_entrada)
+    if not config["biopython_consensus"]["habilitado"]:
+        return await tarea_ugene, False
+
+    tarea_levitsky = asyncio.to_thread(
+        generar_consenso_levitsky,
+        alineamiento,
+        config["biopython_consensus"]["archivo_salida"],
+        config
+    )
+    return tuple(await asyncio.gather(tarea_ugene, tarea_levitsky))
 
 # -------------------------------------------------
 # FUNCIÓN DE RECORTE
@@ -75,48 +101,49 @@ def es_codon_valido(secuencia, posicion):
             secuencia[posicion+1] != '-' and 
             secuencia[posicion+2] != '-')
 
-def recortar_secuencias(archivo_entrada, archivo_salida, config):
+def recortar_secuencias(alineamiento, archivo_salida, config):
     """
     Recorta secuencias usando posiciones fijas (si están definidas) o codones (si no lo están).
+    Devuelve el alineamiento recortado (vista de columnas del original) o None si falla.
     """
     try:
         params = config["mafft"]["procesar_codones"]
-        registros = list(SeqIO.parse(archivo_entrada, "fasta"))
         
-        if not registros:
+        if len(alineamiento) == 0:
             print("❌ Error: No se encontraron secuencias en el archivo de entrada")
-            return False
+            return None
 
         pos_inicio_fijo = params.get("posicion_inicio_fijo")
         pos_fin_fijo = params.get("posicion_fin_fijo")
         codon_inicio = params["codon_inicio"][0]
         codones_parada = set(params["codones_parada"])
+        longitud = alineamiento.n_columnas
 
         posiciones_inicio, posiciones_fin = [], []
 
-        for registro in registros:
-            secuencia = str(registro.seq).upper()
-            if len(secuencia) < 3:
-                print(f"⚠️  Secuencia {registro.id} demasiado corta")
-                continue
-
-            # --- INICIO ---
-            if pos_inicio_fijo is None:
-                pos_inicio = -1
-                for i in range(0, len(secuencia)-2):
-                    if es_codon_valido(secuencia, i) and secuencia[i:i+3] == codon_inicio:
-                        pos_inicio = i
-                        break
-                posiciones_inicio.append(pos_inicio if pos_inicio != -1 else 0)
-
-            # --- FIN ---
-            if pos_fin_fijo is None:
-                pos_fin = -1
-                for i in range(len(secuencia)-3, 0, -1):
-                    if es_codon_valido(secuencia, i) and secuencia[i:i+3] in codones_parada:
-                        pos_fin = i + 2
-                        break
-                posiciones_fin.append(pos_fin if pos_fin != -1 else len(secuencia)-1)
+        if longitud < 3:
+            print("⚠️  Secuencias demasiado cortas")
+        elif pos_inicio_fijo is None or pos_fin_fijo is None:
+            for indice in range(len(alineamiento)):
+                secuencia = alineamiento.secuencia(indice)
+
+                # --- INICIO ---
+                if pos_inicio_fijo is None:
+                    pos_inicio = -1
+                    for i in range(0, len(secuencia)-2):
+                        if es_codon_valido(secuencia, i) and secuencia[i:i+3] == codon_inicio:
+                            pos_inicio = i
+                            break
+                    posiciones_inicio.append(pos_inicio if pos_inicio != -1 else 0)
+
+                # --- FIN ---
+                if pos_fin_fijo is None:
+                    pos_fin = -1
+                    for i in range(len(secuencia)-3, 0, -1):
+                        if es_codon_valido(secuencia, i) and secuencia[i:i+3] in codones_parada:
+                            pos_fin = i + 2
+                            break
+                    posiciones_fin.append(pos_fin if pos_fin != -1 else len(secuencia)-1)
 
         try:
             inicio_comun = int(pos_inicio_fijo) if pos_inicio_fijo is not None else mode(posiciones_inicio)
@@ -126,33 +153,31 @@ def recortar_secuencias(archivo_entrada, archivo_salida, config):
         try:
             fin_comun = int(pos_fin_fijo-2) if pos_fin_fijo is not None else mode(posiciones_fin)
         except StatisticsError:
-            fin_comun = max(posiciones_fin) if posiciones_fin else len(secuencia)-1
+            fin_comun = max(posiciones_fin) if posiciones_fin else longitud-1
 
         if inicio_comun < 0 or fin_comun < 0 or inicio_comun >= fin_comun:
             print("❌ Error en las posiciones de corte")
-            return False
+            return None
 
-        with open(archivo_salida, "w") as salida:
-            for registro in registros:
-                secuencia = str(registro.seq)
-                fin = min(fin_comun, len(secuencia)-1)
-                recortada = secuencia[inicio_comun:fin + 1]
-                salida.write(f">{registro.id}\n{recortada}\n")
+        recortado = alineamiento.recortar(inicio_comun, min(fin_comun, longitud-1))
+        recortado.escribir_fasta(archivo_salida)
 
         print(f"✅ Secuencias recortadas guardadas en: {archivo_salida}")
-        return True
+        return recortado
 
     except Exception as e:
         print(f"❌ Error inesperado al recortar: {str(e)}")
         import traceback
         traceback.print_exc()
-        return False
+        return None
 
 # -------------------------------------------------
 # FUNCIÓN DE CONSENSO LEVITSKY
 # -------------------------------------------------
-def generar_consenso_levitsky(archivo_entrada, archivo_salida, config):
+def generar_consenso_levitsky(alineamiento, archivo_salida, config):
     """Genera consenso estilo Levitsky con IUPAC."""
+    from alineamiento import consenso_levitsky
+
     try:
         params = config["biopython_consensus"]
         umbral = params.get("umbral", 0.6)
@@ -160,57 +185,15 @@ def generar_consenso_levitsky(archivo_entrada, archivo_salida, config):
 
         print(f"🔬 Generando consenso IUPAC (Levitsky, umbral={umbral})...")
 
-        alineamiento = AlignIO.read(archivo_entrada, "fasta")
-        longitud = alineamiento.get_alignment_length()
-        n_secuencias = len(alineamiento)
-        if n_secuencias == 0:
+        if len(alineamiento) == 0:
             print("❌ Error: Alineamiento vacío")
             return False
 
-        iupac_map = {
-            'A': 'A', 'C': 'C', 'G': 'G', 'T': 'T',
-            'AC': 'M', 'AG': 'R', 'AT': 'W',
-            'CG': 'S', 'CT': 'Y', 'GT': 'K',
-            'ACG': 'V', 'ACT': 'H', 'AGT': 'D', 'CGT': 'B',
-            'ACGT': 'N'
-        }
-
-        consenso = []
-        for pos in range(longitud):
-            columna = alineamiento[:, pos]
-            conteo = {'A':0, 'C':0, 'G':0, 'T':0, '-':0, 'N':0}
-            for nt in columna:
-                nt = nt.upper()
-                if nt in conteo:
-                    conteo[nt] += 1
-                else:
-                    conteo['N'] += 1
-
-            total_valido = n_secuencias
-            if ignorar_gaps:
-                total_valido -= conteo['-']
-
-            if total_valido == 0:
-                consenso.append('-')
-                continue
-
-            perfil = {base: conteo[base] / total_valido for base in ['A','C','G','T']}
-            bases_consenso = [b for b,f in perfil.items() if f >= umbral]
-
-            if not bases_consenso:
-                sorted_bases = sorted(perfil.items(), key=lambda x: x[1], reverse=True)
-                top_bases = [b for b,f in sorted_bases if f > 0][:3]
-                clave = ''.join(sorted(top_bases))
-                consenso.append(iupac_map.get(clave, 'N'))
-            elif len(bases_consenso) == 1:
-                consenso.append(bases_consenso[0])
-            else:
-                clave = ''.join(sorted(bases_consenso))
-                consenso.append(iupac_map.get(clave, 'N'))
-
-        with open(archivo_salida, "w") as salida:
+        consenso = consenso_levitsky(alineamiento.conteos_columnas(), umbral, ignorar_gaps)
+
+        with escritura_atomica(archivo_salida) as salida:
             salida.write(f">consenso_levitsky_umbral_{umbral}\n")
-            salida.write(''.join(consenso) + "\n")
+            salida.write(consenso + "\n")
 
         print(f"✅ Consenso Levitsky generado ({len(consenso)} bp)")
         return True
@@ -220,44 +203,46 @@ def generar_consenso_levitsky(archivo_entrada, archivo_salida, config):
         return False
 
 # -------------------------------------------------
-# FLUJO DE TRABAJO (MAIN)
+# FLUJO DE TRABAJO
 # -------------------------------------------------
-if __name__ == "__main__":
-    config = cargar_configuracion()
+def ejecutar_alineamiento(config):
+    """Etapa 2: alineamiento MAFFT, recorte y consensos."""
+    from alineamiento import Alineamiento
 
     alineamiento_mafft = "alineamiento_MAFFT.fa"
     alineamiento_procesado = "alineamiento_procesado.fa"
 
-    # Paso 1: Alineamiento con MAFFT, puede reemplazar en parametros "auto" por "genafpair", "localpair" o "globalpair"
-    comando_mafft = (
-        f'mafft --{config["mafft"]["metodo"]} --ep {config["mafft"]["ep"]} {config["mafft"]["opcionales"]} '
-        f'--op {config["mafft"]["op"]} --thread {config["mafft"]["hilos"]} '
-        f'--out {alineamiento_mafft} {config["filtro"]["archivo_salida"]}'
-        
-    )
-    if not ejecutar_comando(comando_mafft):
-        sys.exit(1)
+    # Paso 1: Alineamiento con MAFFT (si falla, el alineamiento anterior no se toca)
+    try:
+        with ruta_atomica(alineamiento_mafft) as temporal:
+            comando = comando_mafft(config, config["filtro"]["archivo_salida"], temporal)
+            if not ejecutar_comando(comando, "mafft", config, "mafft") or not Path(temporal).exists():
+                raise RuntimeError(f"MAFFT no generó '{alineamiento_mafft}'")
+    except RuntimeError as e:
+        print(f"❌ Error: {str(e)}")
+        return False
 
-    # Paso 2: Recorte de secuencias
-    if not recortar_secuencias(alineamiento_mafft, alineamiento_procesado, config):
-        sys.exit(1)
+    # Paso 2: Recorte de secuencias (una sola lectura del alineamiento)
+    recortado = recortar_secuencias(Alineamiento.desde_fasta(alineamiento_mafft), alineamiento_procesado, config)
+    if recortado is None:
+        return False
 
-    # Paso 3: Consenso con UGENE
-    consenso_ugene_ok = ejecutar_comando_ugene(config, alineamiento_procesado)
+    # Caché binaria del alineamiento recortado, leída por la cobertura del reporte
+    cache_alineamiento = config.get("alineamiento", {}).get("cache")
+    if cache_alineamiento:
+        recortado.guardar_cache(cache_alineamiento)
 
-    # Paso 4: Consenso con Biopython (Levitsky)
-    consenso_levitsky_ok = False
-    if config["biopython_consensus"]["habilitado"]:
-        consenso_levitsky_ok = generar_consenso_levitsky(
-            alineamiento_procesado, 
-            config["biopython_consensus"]["archivo_salida"], 
-            config
-        )
+    # Pasos 3 y 4: Consenso con UGENE y con Biopython (Levitsky) en paralelo
+    consenso_ugene_ok, consenso_levitsky_ok = asyncio.run(
+        generar_consensos(config, alineamiento_procesado, recortado)
+    )
 
     # 📌 Reporte final
     print("\n✅ Flujo de trabajo completado. Archivos generados:")
     print(f"- Alineamiento MAFFT (original): {alineamiento_mafft}")
     print(f"- Alineamiento procesado (recortado): {alineamiento_procesado}")
+    if cache_alineamiento:
+        print(f"- Caché binaria del alineamiento: {cache_alineamiento}.npy")
 
     if consenso_ugene_ok:
         print(f"✅ Consenso UGENE: {config['ugene']['archivo_salida']}")
@@ -268,4 +253,13 @@ if __name__ == "__main__":
         if consenso_levitsky_ok:
             print(f"✅ Consenso Levitsky (Biopython): {config['biopython_consensus']['archivo_salida']}")
         else:
-            print("⚠️  Consenso Levitsky no se generó.")
\ No newline at end of file
+            print("⚠️  Consenso Levitsky no se generó.")
+
+    return True
+
+# -------------------------------------------------
+# MAIN
+# -------------------------------------------------
+if __name__ == "__main__":
+    if not ejecutar_alineamiento(obtener_configuracion()):
+        sys.exit(1)
@@ -1,30 +1,7 @@
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.pdfgen import canvas
-import json
 from pathlib import Path
-
-# Cargar configuración desde JSON
-with open("parametros.json", "r", encoding="utf-8") as f:
-    config = json.load(f)
-
-# Parámetros desde JSON
-CEBADORES_FILE = config["cebador"]["conjunto_cebadores"]  # Archivo con los sets de cebadores
-COLORS = {
-    "directo": getattr(colors, config["pdf"]["color_directo"]),
-    "sonda": getattr(colors, config["pdf"]["color_sonda"]),
-    "reverso": getattr(colors, config["pdf"]["color_reverso"])
-}
-OUTPUT_PDF = config["pdf"]["archivo_salida"]
-PERIODO = config["filtro"]["periodo"]
-MES = config["filtro"]["mes"] if config["filtro"]["mes"] is not None else "todos los meses"
-
-# Selección de consenso según parámetros
-usar_consenso = config.get("reporte", {}).get("usar_consenso", "ugene")
-if usar_consenso == "biopython":
-    CONSENSO_FILE = config["biopython_consensus"]["archivo_salida"]
-else:
-    CONSENSO_FILE = config["ugene"]["archivo_salida"]
+from archivos import ruta_atomica
+from configuracion import cargar_configuracion
+from termodinamica import puntaje_termodinamico
 
 # Diccionario IUPAC para bases ambiguas
 iupac_codes = {
@@ -62,6 +39,35 @@ def calcular_puntaje_coincidencia(base_consensus, base_primer):
     
     return 0.0
 
+MODOS_PUNTAJE = ("identidad", "termodinamico")
+
+def parametros_puntaje(config):
+    """Modo de puntaje y condiciones de reacción desde la sección 'reporte'."""
+    reporte = config.get("reporte", {})
+    termodinamica = reporte.get("termodinamica", {})
+    # "identidad" (pesos IUPAC) o "termodinamico" (ΔG nearest-neighbour)
+    modo = reporte.get("modo_puntaje", "identidad")
+    if modo not in MODOS_PUNTAJE:
+        raise ValueError(f"reporte.modo_puntaje debe ser uno de {MODOS_PUNTAJE}, no '{modo}'")
+    return {
+        'modo': modo,
+        'na_mM': termodinamica.get("na_mM", 50.0),
+        'cebador_nM': termodinamica.get("cebador_nM", 250.0)
+    }
+
+def puntuar_cebador(consensus_seq, posicion, cebador, puntaje):
+    """
+    Puntúa un cebador contra la ventana del consenso que inicia en 'posicion'.
+    Devuelve (identidad 0-1, puntaje acumulado, datos termodinámicos o None).
+    """
+    ventana = consensus_seq[posicion:posicion + len(cebador)]
+    if puntaje['modo'] == "termodinamico":
+        fraccion, dg, tm = puntaje_termodinamico(cebador, ventana, puntaje['na_mM'], puntaje['cebador_nM'])
+        return fraccion, fraccion * len(cebador), {'dg': dg, 'tm': tm}
+
+    acumulado = sum(calcular_puntaje_coincidencia(c, p) for c, p in zip(ventana, cebador))
+    return acumulado / len(cebador), acumulado, None
+
 def read_cebador_sets(file_path):
     """
     Lee sets de cebadores manejando nombres multilínea correctamente.
@@ -122,8 +128,9 @@ def read_cebador_sets(file_path):
     return sets
 
 
-def find_best_match_for_set(consensus_seq, primer_set):
+def find_best_match_for_set(consensus_seq, primer_set, config):
     """Encuentra mejor coincidencia para un set completo de cebadores"""
+    puntaje = parametros_puntaje(config)
     best_match = {
         'set_name': primer_set[0],
         'directo': None,
@@ -142,30 +149,26 @@ def find_best_match_for_set(consensus_seq, primer_set):
     reverso = primer_set[3] if len(primer_set) > 3 else primer_set[2] if len(primer_set) == 3 and not sonda else None
     
     for i in range(len(consensus_seq) - len(directo) + 1):
-        directo_score = sum(calcular_puntaje_coincidencia(consensus_seq[i + j], directo[j]) 
-                      for j in range(len(directo)))
-        directo_identity = directo_score / len(directo)
+        directo_identity, directo_score, directo_termo = puntuar_cebador(consensus_seq, i, directo, puntaje)
         
         if reverso:
             min_reverso_pos = i + len(directo) + 50
             max_reverso_pos = i + len(directo) + 300
             
             for k in range(min_reverso_pos, min(len(consensus_seq) - len(reverso) + 1, max_reverso_pos)):
-                reverso_score = sum(calcular_puntaje_coincidencia(consensus_seq[k + l], reverso[l]) 
-                              for l in range(len(reverso)))
-                reverso_identity = reverso_score / len(reverso)
+                reverso_identity, reverso_score, reverso_termo = puntuar_cebador(consensus_seq, k, reverso, puntaje)
                 
                 # Inicializar variables de sonda
                 sonda_score = 0.0
                 sonda_identity = 0.0  # Inicializar aquí
                 sonda_pos = None
+                sonda_termo = None
                 
                 if sonda:
                     sonda_pos = i + len(directo) + (k - (i + len(directo))) // 2
                     if sonda_pos + len(sonda) <= k:
-                        sonda_score = sum(calcular_puntaje_coincidencia(consensus_seq[sonda_pos + m], sonda[m]) 
-                                  for m in range(len(sonda)))
-                        sonda_identity = sonda_score / len(sonda)  # Actualizar solo si hay sonda válida
+                        # Actualizar solo si hay sonda válida
+                        sonda_identity, sonda_score, sonda_termo = puntuar_cebador(consensus_seq, sonda_pos, sonda, puntaje)
                 
                 # CALCULAR PUNTAJE TOTAL COMO PROMEDIO
                 total_elements = 2  # Directo y reverso siempre existen
@@ -184,19 +187,22 @@ def find_best_match_for_set(consensus_seq, primer_set):
                             'cebador': directo,
                             'puntaje': directo_identity,
                             'posiciones': i,
-                            'puntaje_total': directo_score
+                            'puntaje_total': directo_score,
+                            'termodinamica': directo_termo
                         },
                         'sonda': {
                             'cebador': sonda,
                             'puntaje': sonda_identity,
                             'posiciones': sonda_pos,
-                            'puntaje_total': sonda_score
+                            'puntaje_total': sonda_score,
+                            'termodinamica': sonda_termo
                         } if sonda else None,
                         'reverso': {
                             'cebador': reverso,
                             'puntaje': reverso_identity,
                             'posiciones': k,
-                            'puntaje_total': reverso_score
+                            'puntaje_total': reverso_score,
+                            'termodinamica': reverso_termo
                         },
                         'puntaje_total': average_score,
                         'posiciones': (i, k),
@@ -223,9 +229,42 @@ def get_comparison_symbol(base_consensus, base_primer):
     else:
         return ' '      # Sin coincidencia
 
-def export_to_pdf(consensus_seq, best_set, archivo_salida=OUTPUT_PDF):
+def formatear_termodinamica(termo):
+    """Texto con ΔG37 y Tm del dúplex para consola y PDF."""
+    tm = f"{termo['tm']:.1f} °C" if termo['tm'] is not None else "n/d"
+    return f"ΔG37: {termo['dg']:.2f} kcal/mol | Tm: {tm}"
+
+def export_to_pdf(consensus_seq, best_set, config, archivo_salida=None):
     """Genera un PDF con márgenes de 1 cm y alineación mejorada"""
-    c = canvas.Canvas(archivo_salida, pagesize=letter)
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib import colors
+    from reportlab.pdfgen import canvas
+
+    archivo_salida = archivo_salida or config["pdf"]["archivo_salida"]
+    COLORS = {
+        "directo": getattr(colors, config["pdf"]["color_directo"]),
+        "sonda": getattr(colors, config["pdf"]["color_sonda"]),
+        "reverso": getattr(colors, config["pdf"]["color_reverso"])
+    }
+    PERIODO = config["filtro"]["periodo"]
+    if PERIODO is None:
+        PERIODO = "todos los años"
+    MES = config["filtro"].get("mes")
+    if MES is None:
+        MES = "todos los meses"
+
+    # El PDF se escribe en un temporal y solo se publica completo
+    with ruta_atomica(archivo_salida) as temporal:
+        c = canvas.Canvas(temporal, pagesize=letter)
+        dibujar_pdf(c, consensus_seq, best_set, COLORS, PERIODO, MES)
+        c.save()
+    print(f"\nPDF generado: {archivo_salida}")
+
+def dibujar_pdf(c, consensus_seq, best_set, COLORS, PERIODO, MES):
+    """Dibuja el reporte del mejor set y el consenso en el lienzo 'c'."""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib import colors
+
     width, height = letter
     
     # Definir márgenes
@@ -320,7 +359,14 @@ def export_to_pdf(consensus_seq, best_set, archivo_salida=OUTPUT_PDF):
                      f"Identidad: {data['puntaje']:.2%} | "
                      f"Puntaje: {data['puntaje_total']:.2f}")
             c.drawString(MARGIN_LEFT, y_pos, stats)
-            y_pos -= 20
+            y_pos -= 15
+            if data.get('termodinamica'):
+                c.drawString(MARGIN_LEFT, y_pos, formatear_termodinamica(data['termodinamica']))
+                y_pos -= 15
+            if 'cobertura' in data:
+                c.drawString(MARGIN_LEFT, y_pos, formatear_cobertura(data))
+                y_pos -= 15
+            y_pos -= 5
             
             # COMPARACIÓN DETALLADA
             c.setFont(*styles['match_title'])
@@ -404,11 +450,75 @@ def export_to_pdf(consensus_seq, best_set, archivo_salida=OUTPUT_PDF):
             
             c.setFillColor(colors.black)
             c.drawString(MARGIN_LEFT + j * 7, y, char)
-    
-    c.save()
-    print(f"\nPDF generado: {archivo_salida}")
 
-def main():
+def calcular_cobertura(alineamiento, best_set, umbral_identidad):
+    """
+    Agrega a cada cebador del set la fracción de secuencias alineadas cuya
+    identidad IUPAC en la posición del cebador es >= umbral_identidad.
+    Las posiciones N no cuentan, y las secuencias con solo N en la ventana se omiten.
+    Las posiciones del consenso deben coincidir con las columnas del alineamiento.
+    """
+    import numpy as np
+
+    for key in ['directo', 'sonda', 'reverso']:
+        data = best_set.get(key)
+        if not data:
+            continue
+        cebador = data['cebador']
+        inicio = data['posiciones']
+        ventana = alineamiento.matriz[:, inicio:inicio + len(cebador)]
+
+        # Tabla (posición del cebador x byte) con True si la base es compatible
+        compatibles = np.zeros((len(cebador), 256), dtype=bool)
+        for j, base in enumerate(cebador):
+            for b in iupac_codes.get(base, {base}):
+                compatibles[j, ord(b)] = True
+            compatibles[j, ord(base)] = True
+
+        # Las N son dato faltante: no suman ni restan identidad
+        faltantes = ventana == ord('N')
+        coincidencias = compatibles[np.arange(ventana.shape[1]), ventana] & ~faltantes
+        validas = ventana.shape[1] - faltantes.sum(axis=1)
+        informativas = validas > 0
+        identidad = coincidencias.sum(axis=1)[informativas] / validas[informativas]
+        data['cobertura'] = float((identidad >= umbral_identidad).mean()) if len(identidad) else 0.0
+        data['n_secuencias'] = len(identidad)
+
+def cobertura_desde_cache(consensus_seq, best_set, config):
+    """Calcula la cobertura leyendo la caché binaria del alineamiento recortado, si existe."""
+    from alineamiento import Alineamiento
+
+    cache = config.get("alineamiento", {}).get("cache")
+    if not cache or not Path(f"{cache}.npy").exists():
+        return
+    alineamiento = Alineamiento.desde_cache(cache)
+    if alineamiento.n_columnas != len(consensus_seq):
+        print("⚠️  El consenso no tiene las mismas columnas que el alineamiento; se omite la cobertura.")
+        return
+    umbral = config.get("reporte", {}).get("umbral_cobertura", 0.9)
+    calcular_cobertura(alineamiento, best_set, umbral)
+
+def formatear_cobertura(data):
+    """Texto de cobertura del cebador sobre las secuencias alineadas."""
+    return f"Cobertura: {data['cobertura']:.2%} de {data['n_secuencias']} secuencias"
+
+def archivo_consenso(config):
+    """Selección de consenso según parámetros."""
+    usar_consenso = config.get("reporte", {}).get("usar_consenso", "ugene")
+    if usar_consenso == "biopython":
+        return config["biopython_consensus"]["archivo_salida"]
+    return config["ugene"]["archivo_salida"]
+
+def main(config=None):
+    config = config or cargar_configuracion()
+    CONSENSO_FILE = archivo_consenso(config)
+    CEBADORES_FILE = config["cebador"]["conjunto_cebadores"]  # Archivo con los sets de cebadores
+    try:
+        parametros_puntaje(config)
+    except ValueError as e:
+        print(f"Error: {str(e)}")
+        return
+
     # === Leer archivo de consenso seleccionado ===
     try:
         with open(CONSENSO_FILE, "r") as f:
@@ -431,9 +541,12 @@ def main():
     
     for primer_set in sets:
         if len(primer_set) >= 3:
-            current_set = find_best_match_for_set(consensus_seq, primer_set)
+            current_set = find_best_match_for_set(consensus_seq, primer_set, config)
             if current_set['puntaje_total'] > best_set['puntaje_total']:
                 best_set = current_set
+
+    if best_set['puntaje_total'] > 0:
+        cobertura_desde_cache(consensus_seq, best_set, config)
     
     print("="*70)
     print("RESULTADOS DEL ANÁLISIS DE CEBADORES".center(70))
@@ -451,10 +564,15 @@ def main():
                 print(f"    Posición: {data['posiciones']}")
                 print(f"    Identidad: {data['puntaje']:.2%}")
                 print(f"    Puntaje: {data['puntaje_total']:.2f}")
+                if data.get('termodinamica'):
+                    print(f"    {formatear_termodinamica(data['termodinamica'])}")
+                if 'cobertura' in data:
+                    print(f"    {formatear_cobertura(data)}")
     else:
         print("\nNo se encontró ningún set de cebadores con un match adecuado.")
     
-    export_to_pdf(consensus_seq, best_set)
+    export_to_pdf(consensus_seq, best_set, config)
+    return best_set
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,130 @@
+import numpy as np
+from archivos import escritura_atomica
+
+# Filas de la tabla de conteos por columna; 'N' es la N literal (dato faltante)
+# y 'X' agrupa cualquier otro símbolo (ambigüedades IUPAC como R, Y o K)
+ALFABETO = 'ACGT-NX'
+_CATEGORIA = np.full(256, ALFABETO.index('X'), dtype=np.uint8)
+for _i, _base in enumerate(ALFABETO):
+    _CATEGORIA[ord(_base)] = _i
+
+IUPAC_MAP = {
+    'A': 'A', 'C': 'C', 'G': 'G', 'T': 'T',
+    'AC': 'M', 'AG': 'R', 'AT': 'W',
+    'CG': 'S', 'CT': 'Y', 'GT': 'K',
+    'ACG': 'V', 'ACT': 'H', 'AGT': 'D', 'CGT': 'B',
+    'ACGT': 'N'
+}
+
+class Alineamiento:
+    """
+    Alineamiento compacto: matriz uint8 (secuencias x columnas) con un byte
+    ASCII en mayúscula por base, más la lista de IDs en el mismo orden.
+    """
+
+    def __init__(self, ids, matriz):
+        self.ids = ids
+        self.matriz = matriz
+
+    @classmethod
+    def desde_fasta(cls, ruta):
+        """Lee un FASTA alineado (secuencias de igual longitud) en una sola pasada."""
+        ids, secuencias, actual = [], [], []
+        with open(ruta, "rb") as archivo:
+            for linea in archivo:
+                linea = linea.strip()
+                if not linea:
+                    continue
+                if linea.startswith(b'>'):
+                    if ids:
+                        secuencias.append(b''.join(actual))
+                    ids.append(linea[1:].split()[0].decode())
+                    actual = []
+                else:
+                    actual.append(linea.upper())
+        if ids:
+            secuencias.append(b''.join(actual))
+
+        longitud = max((len(s) for s in secuencias), default=0)
+        matriz = np.full((len(secuencias), longitud), ord('-'), dtype=np.uint8)
+        for i, secuencia in enumerate(secuencias):
+            matriz[i, :len(secuencia)] = np.frombuffer(secuencia, dtype=np.uint8)
+        return cls(ids, matriz)
+
+    @classmethod
+    def desde_cache(cls, ruta_base, mmap=True):
+        """Carga '<ruta_base>.npy' (memoria mapeada si mmap=True) y '<ruta_base>.ids'."""
+        matriz = np.load(f"{ruta_base}.npy", mmap_mode='r' if mmap else None)
+        with open(f"{ruta_base}.ids", "r", encoding="utf-8") as archivo:
+            ids = archivo.read().splitlines()
+        return cls(ids, matriz)
+
+    def guardar_cache(self, ruta_base):
+        """Guarda la matriz en binario ('.npy') y los IDs en texto ('.ids')."""
+        with escritura_atomica(f"{ruta_base}.ids", "w") as archivo:
+            archivo.write('\n'.join(self.ids) + '\n')
+        with escritura_atomica(f"{ruta_base}.npy", "wb") as archivo:
+            np.save(archivo, np.ascontiguousarray(self.matriz))
+
+    def __len__(self):
+        return self.matriz.shape[0]
+
+    @property
+    def n_columnas(self):
+        return self.matriz.shape[1]
+
+    def secuencia(self, indice):
+        return self.matriz[indice].tobytes().decode('ascii')
+
+    def recortar(self, inicio, fin):
+        """Columnas inicio..fin (inclusive) como vista, sin copiar la matriz."""
+        return Alineamiento(self.ids, self.matriz[:, inicio:fin + 1])
+
+    def escribir_fasta(self, ruta):
+        with escritura_atomica(ruta) as salida:
+            for indice, id_secuencia in enumerate(self.ids):
+                salida.write(f">{id_secuencia}\n{self.secuencia(indice)}\n")
+
+    def conteos_columnas(self, filas=None):
+        """
+        Conteo por columna de cada símbolo de ALFABETO, como matriz
+        (len(ALFABETO) x columnas). 'filas' restringe el conteo a un subconjunto.
+        """
+        matriz = self.matriz if filas is None else self.matriz[filas]
+        categorias = _CATEGORIA[matriz]
+        return np.stack([(categorias == i).sum(axis=0) for i in range(len(ALFABETO))])
+
+def consenso_levitsky(conteos, umbral, ignorar_gaps=True):
+    """Consenso IUPAC estilo Levitsky a partir de una tabla de conteos por columna."""
+    indice = {base: ALFABETO.index(base) for base in ALFABETO}
+    n_secuencias = int(conteos[:, 0].sum()) if conteos.shape[1] else 0
+
+    consenso = []
+    for pos in range(conteos.shape[1]):
+        conteo = {base: int(conteos[indice[base], pos]) for base in ALFABETO}
+
+        # La N literal es dato faltante y no cuenta en el total; las demás
+        # ambigüedades siguen contando, como antes de tratar las N
+        total_valido = n_secuencias - conteo['N']
+        if ignorar_gaps:
+            total_valido -= conteo['-']
+
+        if total_valido == 0:
+            consenso.append('N' if conteo['N'] else '-')
+            continue
+
+        perfil = {base: conteo[base] / total_valido for base in ['A','C','G','T']}
+        bases_consenso = [b for b,f in perfil.items() if f >= umbral]
+
+        if not bases_consenso:
+            sorted_bases = sorted(perfil.items(), key=lambda x: x[1], reverse=True)
+            top_bases = [b for b,f in sorted_bases if f > 0][:3]
+            clave = ''.join(sorted(top_bases))
+            consenso.append(IUPAC_MAP.get(clave, 'N'))
+        elif len(bases_consenso) == 1:
+            consenso.append(bases_consenso[0])
+        else:
+            clave = ''.join(sorted(bases_consenso))
+            consenso.append(IUPAC_MAP.get(clave, 'N'))
+
+    return ''.join(consenso)
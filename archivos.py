@@ -0,0 +1,51 @@
+import contextlib
+import hashlib
+import os
+from pathlib import Path
+
+def ruta_temporal(ruta):
+    """Archivo temporal en el mismo directorio, para que os.replace sea atómico."""
+    ruta = Path(ruta)
+    return str(ruta.with_name(f".{ruta.name}.tmp-{os.getpid()}"))
+
+def publicar_si(ok, temporal, ruta):
+    """
+    Renombra 'temporal' a 'ruta' si ok; si no, lo descarta. Devuelve si se
+    publicó: una herramienta que termina bien sin escribir su salida cuenta como fallo.
+    """
+    ok = ok and Path(temporal).exists()
+    if ok:
+        os.replace(temporal, ruta)
+    else:
+        Path(temporal).unlink(missing_ok=True)
+    return ok
+
+@contextlib.contextmanager
+def ruta_atomica(ruta):
+    """
+    Entrega una ruta temporal para que una herramienta escriba su salida; al
+    terminar sin errores se renombra a 'ruta'. Si falla, la ruta final no se toca.
+    """
+    temporal = ruta_temporal(ruta)
+    try:
+        yield temporal
+        os.replace(temporal, ruta)
+    finally:
+        Path(temporal).unlink(missing_ok=True)
+
+@contextlib.contextmanager
+def escritura_atomica(ruta, modo="w", **opciones):
+    """Abre un archivo para escritura que solo aparece completo en 'ruta' (o no aparece)."""
+    with ruta_atomica(ruta) as temporal:
+        with open(temporal, modo, **opciones) as archivo:
+            yield archivo
+            archivo.flush()
+            os.fsync(archivo.fileno())
+
+def hash_archivo(ruta, bloque=1 << 20):
+    """SHA-256 del contenido de un archivo, leído por bloques."""
+    sha = hashlib.sha256()
+    with open(ruta, "rb") as archivo:
+        while datos := archivo.read(bloque):
+            sha.update(datos)
+    return sha.hexdigest()
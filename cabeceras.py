@@ -0,0 +1,98 @@
+import csv
+import re
+from archivos import escritura_atomica
+
+# Fecha YYYY, YYYY-MM o YYYY-MM-DD con separador '-' o '/'
+PATRON_FECHA = re.compile(r'\d{4}(?:[-/]\d{1,2}){0,2}')
+SEPARADOR_FECHA = re.compile(r'[-/]')
+
+# Orden de los campos de la cabecera en cada formato de descarga
+ESQUEMAS = {
+    # >A/Brisbane/02/2018|EPI_ISL_123456|A_/_H1N1|2018-01-04
+    "gisaid": {"separador": "|", "campos": ["cepa", "id_aislamiento", "subtipo", "fecha"]},
+    # >CY121680|A/Boston/DOA2107/2012|4|H1N1|Human|USA|2012/11/01
+    "ncbi": {"separador": "|", "campos": ["accesion", "cepa", "segmento", "subtipo", "hospedero", "pais", "fecha"]},
+    # Sin nombres de campo: solo se detecta la columna de fecha
+    "auto": {"separador": "|", "campos": []}
+}
+
+def normalizar_fecha(campo):
+    """'YYYY[-MM[-DD]]' → 'YYYY-MM-DD' (rellena con 00 lo que falte)."""
+    partes = SEPARADOR_FECHA.split(campo)
+    año = partes[0]
+    mes = partes[1].zfill(2) if len(partes) > 1 else '00'
+    dia = partes[2].zfill(2) if len(partes) > 2 else '00'
+    return f"{año}-{mes}-{dia}"
+
+class LectorCabeceras:
+    """
+    Separa una cabecera FASTA en campos según un esquema con nombres de campo.
+    La columna de fecha se toma del esquema o se detecta en la primera cabecera
+    y se reutiliza mientras siga siendo válida (camino rápido); si no, se vuelve
+    a buscar en todos los campos.
+    """
+
+    def __init__(self, esquema="auto", campos=None, separador=None):
+        base = ESQUEMAS[esquema]
+        self.separador = separador or base["separador"]
+        self.campos = list(campos) if campos else list(base["campos"])
+        self.indice_fecha = self.campos.index("fecha") if "fecha" in self.campos else None
+
+    @classmethod
+    def desde_config(cls, config):
+        """Lector según 'filtro.cabecera' (esquema, campos, separador)."""
+        params = config["filtro"].get("cabecera", {})
+        return cls(params.get("esquema", "auto"), params.get("campos"), params.get("separador"))
+
+    def columnas(self):
+        """Nombres de columna de la tabla de metadatos."""
+        nombres = [c for c in self.campos if c != "fecha"]
+        if "cepa" in self.campos:
+            nombres.append("ubicacion")
+        return ["id"] + nombres + ["fecha"]
+
+    def _buscar_fecha(self, campos):
+        for indice, campo in enumerate(campos):
+            if PATRON_FECHA.fullmatch(campo):
+                self.indice_fecha = indice
+                return campo
+        return None
+
+    def fecha(self, campos):
+        """Fecha normalizada a partir de la lista de campos, o None."""
+        indice = self.indice_fecha
+        if indice is not None and indice < len(campos) and PATRON_FECHA.fullmatch(campos[indice]):
+            return normalizar_fecha(campos[indice])
+        campo = self._buscar_fecha(campos)
+        return normalizar_fecha(campo) if campo else None
+
+    def leer(self, cabecera):
+        """Dict de metadatos de una cabecera (con o sin '>'), incluida 'fecha'."""
+        cabecera = cabecera[1:] if cabecera.startswith('>') else cabecera
+        campos = [c.strip() for c in cabecera.split(self.separador)]
+        metadatos = {nombre: campos[i] if i < len(campos) else "" for i, nombre in enumerate(self.campos)}
+        if "cepa" in metadatos:
+            # A/[hospedero/]ubicación/número/año: la ubicación es el antepenúltimo componente
+            partes = metadatos["cepa"].split('/')
+            metadatos["ubicacion"] = partes[-3] if len(partes) >= 4 else ""
+        metadatos["fecha"] = self.fecha(campos)
+        return metadatos
+
+class TablaMetadatos:
+    """Tabla de metadatos por columnas, llenada durante el recorrido del FASTA."""
+
+    def __init__(self, columnas):
+        self.columnas = {nombre: [] for nombre in columnas}
+
+    def agregar(self, fila):
+        for nombre, valores in self.columnas.items():
+            valores.append(fila.get(nombre) or "")
+
+    def __len__(self):
+        return len(next(iter(self.columnas.values()), []))
+
+    def guardar_csv(self, ruta):
+        with escritura_atomica(ruta, newline="") as archivo:
+            escritor = csv.writer(archivo)
+            escritor.writerow(self.columnas)
+            escritor.writerows(zip(*self.columnas.values()))
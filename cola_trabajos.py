@@ -0,0 +1,170 @@
+import json
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+class ColaTrabajos(ABC):
+    """
+    Interfaz de la cola de trabajos (segmento, período, tabla de cebadores).
+    Un backend distribuido debe implementar los mismos métodos.
+    """
+
+    @abstractmethod
+    def encolar(self, trabajo, max_intentos=3):
+        """Agrega un trabajo (dict). Encolar dos veces el mismo trabajo no lo duplica."""
+
+    @abstractmethod
+    def reclamar(self, trabajador, arriendo_s):
+        """Toma el siguiente trabajo disponible: devuelve (id, trabajo) o None."""
+
+    @abstractmethod
+    def renovar(self, id_trabajo, trabajador, arriendo_s):
+        """Extiende el arriendo de un trabajo en curso; False si ya no pertenece al trabajador."""
+
+    @abstractmethod
+    def completar(self, id_trabajo, trabajador, resultado):
+        """Guarda el resultado y cierra el trabajo; False si ya no pertenece al trabajador."""
+
+    @abstractmethod
+    def fallar(self, id_trabajo, trabajador, error):
+        """Registra un error; el trabajo vuelve a la cola mientras queden intentos."""
+
+    @abstractmethod
+    def resultados(self):
+        """Lista de dicts con el estado y resultado de cada trabajo."""
+
+def clave_trabajo(trabajo):
+    """Clave estable de un trabajo, usada para encolar de forma idempotente."""
+    return json.dumps(trabajo, sort_keys=True, ensure_ascii=False)
+
+class ColaSQLite(ColaTrabajos):
+    """
+    Cola en un archivo SQLite, para una sola máquina o un disco compartido.
+    Un trabajo 'en_curso' cuyo arriendo venció (trabajador caído) vuelve a
+    poder reclamarse; tras 'max_intentos' reclamos queda como 'fallido'.
+    """
+
+    def __init__(self, ruta="cola_trabajos.sqlite"):
+        # Ruta absoluta: los trabajos cambian de directorio mientras corren
+        self.ruta = str(Path(ruta).resolve())
+        conexion = self._conectar()
+        try:
+            conexion.execute("""
+                CREATE TABLE IF NOT EXISTS trabajos (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    clave TEXT UNIQUE NOT NULL,
+                    datos TEXT NOT NULL,
+                    estado TEXT NOT NULL DEFAULT 'pendiente',
+                    intentos INTEGER NOT NULL DEFAULT 0,
+                    max_intentos INTEGER NOT NULL,
+                    trabajador TEXT,
+                    arriendo_hasta REAL,
+                    resultado TEXT,
+                    error TEXT,
+                    actualizado REAL
+                )
+            """)
+        finally:
+            conexion.close()
+
+    def _conectar(self):
+        # Una conexión por operación: permite usar la cola desde varios hilos y procesos
+        conexion = sqlite3.connect(self.ruta, timeout=30, isolation_level=None)
+        conexion.execute("PRAGMA journal_mode=WAL")
+        return conexion
+
+    def _transaccion(self, operacion):
+        """Ejecuta 'operacion(conexion)' dentro de una transacción con bloqueo de escritura."""
+        conexion = self._conectar()
+        try:
+            conexion.execute("BEGIN IMMEDIATE")
+            resultado = operacion(conexion)
+            conexion.execute("COMMIT")
+            return resultado
+        except Exception:
+            conexion.execute("ROLLBACK")
+            raise
+        finally:
+            conexion.close()
+
+    def encolar(self, trabajo, max_intentos=3):
+        def operacion(conexion):
+            conexion.execute(
+                "INSERT OR IGNORE INTO trabajos (clave, datos, max_intentos, actualizado) VALUES (?, ?, ?, ?)",
+                (clave_trabajo(trabajo), json.dumps(trabajo, ensure_ascii=False), max_intentos, time.time())
+            )
+            return conexion.execute("SELECT id FROM trabajos WHERE clave = ?", (clave_trabajo(trabajo),)).fetchone()[0]
+        return self._transaccion(operacion)
+
+    def reclamar(self, trabajador, arriendo_s):
+        def operacion(conexion):
+            ahora = time.time()
+            # Arriendos vencidos sin intentos restantes: el trabajo se da por fallido
+            conexion.execute(
+                "UPDATE trabajos SET estado = 'fallido', error = 'arriendo vencido', actualizado = ? "
+                "WHERE estado = 'en_curso' AND arriendo_hasta < ? AND intentos >= max_intentos",
+                (ahora, ahora)
+            )
+            fila = conexion.execute(
+                "SELECT id, datos FROM trabajos WHERE estado = 'pendiente' "
+                "OR (estado = 'en_curso' AND arriendo_hasta < ?) ORDER BY id LIMIT 1",
+                (ahora,)
+            ).fetchone()
+            if fila is None:
+                return None
+            conexion.execute(
+                "UPDATE trabajos SET estado = 'en_curso', trabajador = ?, arriendo_hasta = ?, "
+                "intentos = intentos + 1, actualizado = ? WHERE id = ?",
+                (trabajador, ahora + arriendo_s, ahora, fila[0])
+            )
+            return fila[0], json.loads(fila[1])
+        return self._transaccion(operacion)
+
+    def _actualizar_propio(self, id_trabajo, trabajador, asignaciones, valores):
+        """Actualiza un trabajo solo si sigue en curso y asignado a 'trabajador'."""
+        def operacion(conexion):
+            cursor = conexion.execute(
+                f"UPDATE trabajos SET {asignaciones}, actualizado = ? "
+                "WHERE id = ? AND trabajador = ? AND estado = 'en_curso'",
+                (*valores, time.time(), id_trabajo, trabajador)
+            )
+            return cursor.rowcount == 1
+        return self._transaccion(operacion)
+
+    def renovar(self, id_trabajo, trabajador, arriendo_s):
+        return self._actualizar_propio(id_trabajo, trabajador, "arriendo_hasta = ?", (time.time() + arriendo_s,))
+
+    def completar(self, id_trabajo, trabajador, resultado):
+        return self._actualizar_propio(
+            id_trabajo, trabajador, "estado = 'completado', resultado = ?",
+            (json.dumps(resultado, ensure_ascii=False),)
+        )
+
+    def fallar(self, id_trabajo, trabajador, error):
+        return self._actualizar_propio(
+            id_trabajo, trabajador,
+            "estado = CASE WHEN intentos < max_intentos THEN 'pendiente' ELSE 'fallido' END, error = ?",
+            (str(error),)
+        )
+
+    def resultados(self):
+        conexion = self._conectar()
+        try:
+            filas = conexion.execute(
+                "SELECT id, datos, estado, intentos, trabajador, resultado, error FROM trabajos ORDER BY id"
+            ).fetchall()
+        finally:
+            conexion.close()
+        return [
+            {
+                'id': id_trabajo,
+                'trabajo': json.loads(datos),
+                'estado': estado,
+                'intentos': intentos,
+                'trabajador': trabajador,
+                'resultado': json.loads(resultado) if resultado else None,
+                'error': error
+            }
+            for id_trabajo, datos, estado, intentos, trabajador, resultado, error in filas
+        ]
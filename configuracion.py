@@ -0,0 +1,89 @@
+import json
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+
+ARCHIVO_CONFIGURACION = "parametros.json"
+
+# Claves mínimas que deben existir en cada sección de parametros.json
+CLAVES_REQUERIDAS = {
+    "filtro": ["archivo_entrada", "archivo_salida", "periodo"],
+    "mafft": ["hilos", "ep", "op", "salida"],
+    "ugene": ["umbral", "formato", "archivo_salida"],
+    "biopython_consensus": ["umbral", "habilitado", "archivo_salida"],
+    "cebador": ["conjunto_cebadores"],
+    "pdf": ["archivo_salida", "color_directo", "color_sonda", "color_reverso"]
+}
+
+def _congelar(valor):
+    """Convierte dicts y listas anidadas en estructuras de solo lectura."""
+    if isinstance(valor, dict):
+        return MappingProxyType({k: _congelar(v) for k, v in valor.items()})
+    if isinstance(valor, list):
+        return tuple(_congelar(v) for v in valor)
+    return valor
+
+def _descongelar(valor):
+    """Inverso de _congelar: devuelve dicts y listas mutables."""
+    if isinstance(valor, MappingProxyType):
+        return {k: _descongelar(v) for k, v in valor.items()}
+    if isinstance(valor, tuple):
+        return [_descongelar(v) for v in valor]
+    return valor
+
+def _combinar(base, cambios):
+    """Mezcla recursiva de 'cambios' sobre 'base' (sin modificar ninguno)."""
+    resultado = dict(base)
+    for clave, valor in cambios.items():
+        if isinstance(valor, dict) and isinstance(resultado.get(clave), dict):
+            resultado[clave] = _combinar(resultado[clave], valor)
+        else:
+            resultado[clave] = valor
+    return resultado
+
+def validar_configuracion(datos):
+    """Verifica que todas las secciones tengan sus claves obligatorias."""
+    for seccion, claves in CLAVES_REQUERIDAS.items():
+        faltantes = [c for c in claves if c not in datos.get(seccion, {})]
+        if faltantes:
+            raise KeyError(f"Faltan claves en la sección '{seccion}' de '{ARCHIVO_CONFIGURACION}': {faltantes}")
+
+@dataclass(frozen=True)
+class Configuracion:
+    """
+    Configuración validada e inmutable de una ejecución.
+    Se accede por secciones como un dict: config["mafft"]["hilos"].
+    """
+    datos: MappingProxyType
+
+    @classmethod
+    def desde_dict(cls, datos):
+        validar_configuracion(datos)
+        return cls(_congelar(datos))
+
+    @classmethod
+    def desde_archivo(cls, ruta=ARCHIVO_CONFIGURACION):
+        with open(ruta, "r", encoding="utf-8") as archivo:
+            return cls.desde_dict(json.load(archivo))
+
+    def __getitem__(self, seccion):
+        return self.datos[seccion]
+
+    def __contains__(self, seccion):
+        return seccion in self.datos
+
+    def get(self, seccion, defecto=None):
+        return self.datos.get(seccion, defecto)
+
+    def con_cambios(self, cambios):
+        """Devuelve una nueva configuración con 'cambios' mezclados (ajustes por trabajo)."""
+        return Configuracion.desde_dict(_combinar(self.como_dict(), cambios))
+
+    def como_dict(self):
+        """Copia mutable de la configuración (p. ej. para serializar a JSON)."""
+        return _descongelar(self.datos)
+
+@lru_cache(maxsize=None)
+def cargar_configuracion(ruta=ARCHIVO_CONFIGURACION):
+    """Carga parametros.json una sola vez por proceso y ruta."""
+    return Configuracion.desde_archivo(ruta)
@@ -0,0 +1,19 @@
+import importlib.util
+from functools import lru_cache
+from pathlib import Path
+
+# Scripts de cada etapa del pipeline (sus nombres no son importables con 'import')
+ETAPAS = {
+    "filtrado": "1-Filtracion.py",
+    "alineamiento": "2-Alineamiento.py",
+    "reporte": "3-Reporte.py"
+}
+
+@lru_cache(maxsize=None)
+def cargar_etapa(nombre):
+    """Importa el módulo de una etapa ('filtrado', 'alineamiento' o 'reporte')."""
+    ruta = Path(__file__).resolve().parent / ETAPAS[nombre]
+    spec = importlib.util.spec_from_file_location(f"etapa_{nombre}", ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
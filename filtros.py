@@ -0,0 +1,104 @@
+from pathlib import Path
+
+# Bytes que no cuentan como ambigüedad
+BASES_NO_AMBIGUAS = b'ACGTacgt-'
+
+def _conjunto_ids(valor):
+    """Lista de IDs, o ruta a un archivo con un ID por línea, como set."""
+    if valor is None:
+        return None
+    if isinstance(valor, str):
+        with open(Path(valor), "r", encoding="utf-8") as archivo:
+            return {linea.strip().lstrip('>') for linea in archivo if linea.strip()}
+    return set(valor)
+
+def _limite_fecha(fecha, relleno):
+    """Completa 'YYYY' o 'YYYY-MM' hasta 'YYYY-MM-DD' para comparar como texto."""
+    partes = str(fecha).replace('/', '-').split('-')
+    partes = [partes[0]] + [p.zfill(2) for p in partes[1:]]
+    return '-'.join(partes + [relleno] * (3 - len(partes)))
+
+def _ids_de(etiqueta, campos):
+    """Identificadores con los que puede aparecer una secuencia en las listas."""
+    ids = {etiqueta[1:] if etiqueta.startswith('>') else etiqueta}
+    for nombre in ("id_aislamiento", "accesion"):
+        if campos.get(nombre):
+            ids.add(campos[nombre])
+    return ids
+
+def fraccion_ambigua(secuencia):
+    """Fracción de caracteres distintos de A, C, G, T y gap."""
+    if not secuencia:
+        return 0.0
+    datos = secuencia.encode('ascii', 'replace')
+    return len(datos.translate(None, BASES_NO_AMBIGUAS)) / len(datos)
+
+def fraccion_N(secuencia):
+    """Fracción de posiciones 'N' (solo mayúscula; conteo de bytes en C)."""
+    if not secuencia:
+        return 0.0
+    datos = secuencia.encode('ascii', 'replace')
+    return datos.count(b'N') / len(datos)
+
+def _ordenar(predicados):
+    """Predicados de una lista (costo, predicado), de menor a mayor costo."""
+    return [f for _, f in sorted(predicados, key=lambda p: p[0])]
+
+def compilar_filtros(año, mes, criterios=None):
+    """
+    Convierte 'filtro.periodo', 'filtro.mes' y 'filtro.criterios' en dos cadenas
+    de predicados ordenadas por costo:
+    - de cabecera: f(etiqueta, campos) → bool, se evalúan al leer la cabecera;
+    - de secuencia: f(secuencia) → bool, solo para cabeceras aceptadas.
+    """
+    criterios = criterios or {}
+    cabecera, secuencia = [], []
+
+    # Una lista vacía (o ausente) no filtra, tanto en permitidos como en excluidos
+    permitidos = _conjunto_ids(criterios.get("ids_permitidos"))
+    if permitidos:
+        cabecera.append((0, lambda etiqueta, campos: not permitidos.isdisjoint(_ids_de(etiqueta, campos))))
+
+    excluidos = _conjunto_ids(criterios.get("ids_excluidos"))
+    if excluidos:
+        cabecera.append((0, lambda etiqueta, campos: excluidos.isdisjoint(_ids_de(etiqueta, campos))))
+
+    # Sin fecha no hay forma de aplicar el filtro temporal
+    cabecera.append((1, lambda etiqueta, campos: campos.get("fecha") is not None))
+
+    if año is not None:
+        cabecera.append((2, lambda etiqueta, campos: int(campos["fecha"][:4]) == año))
+    if mes is not None:
+        cabecera.append((2, lambda etiqueta, campos: int(campos["fecha"][5:7]) == mes))
+
+    meses = criterios.get("meses")
+    if meses:
+        meses = set(meses)
+        cabecera.append((2, lambda etiqueta, campos: int(campos["fecha"][5:7]) in meses))
+
+    if criterios.get("fecha_desde"):
+        desde = _limite_fecha(criterios["fecha_desde"], "00")
+        cabecera.append((2, lambda etiqueta, campos: campos["fecha"] >= desde))
+    if criterios.get("fecha_hasta"):
+        hasta = _limite_fecha(criterios["fecha_hasta"], "99")
+        cabecera.append((2, lambda etiqueta, campos: campos["fecha"] <= hasta))
+
+    # Valores permitidos por campo de la cabecera, p. ej. {"pais": ["Chile"]}
+    for nombre, valores in criterios.get("campos", {}).items():
+        valores = {v.lower() for v in valores}
+        cabecera.append((3, lambda etiqueta, campos, nombre=nombre, valores=valores:
+                         campos.get(nombre, "").lower() in valores))
+
+    if criterios.get("longitud_minima"):
+        minima = criterios["longitud_minima"]
+        secuencia.append((0, lambda s: len(s) >= minima))
+
+    if criterios.get("max_fraccion_ambigua") is not None:
+        maxima = criterios["max_fraccion_ambigua"]
+        secuencia.append((1, lambda s: fraccion_ambigua(s) <= maxima))
+
+    return _ordenar(cabecera), _ordenar(secuencia)
+
+def cumple(predicados, *argumentos):
+    """True si todos los predicados aceptan (se detiene en el primero que falla)."""
+    return all(predicado(*argumentos) for predicado in predicados)
@@ -0,0 +1,100 @@
+import asyncio
+import contextlib
+import os
+import re
+import shlex
+import signal
+from pathlib import Path
+
+# Líneas de avance de MAFFT, p. ej. "STEP   120 / 457" o "  300 / 1000"
+PATRON_PROGRESO = re.compile(rb'(?:(STEP)\s+)?(\d+)\s*/\s*(\d+)')
+# Segundos que se espera a que los logs terminen de vaciarse tras matar la herramienta
+ESPERA_DRENADO_S = 5
+
+def mostrar_progreso(nombre, actual, total, etiqueta=None):
+    """Muestra el avance de una herramienta en una sola línea de la terminal."""
+    etiqueta = f"{etiqueta} " if etiqueta else ""
+    print(f"\r⏳ {nombre}: {etiqueta}{actual}/{total}", end="", flush=True)
+
+async def _transmitir(flujo, archivo_log, nombre, al_progresar):
+    """Copia un flujo del proceso al log por bloques y reporta el avance."""
+    with open(archivo_log, "wb") as log:
+        pendiente = b""
+        while True:
+            bloque = await flujo.read(4096)
+            if not bloque:
+                break
+            log.write(bloque)
+            log.flush()
+            if al_progresar is None:
+                continue
+            # MAFFT reescribe la línea de avance con '\r'
+            lineas = re.split(rb'[\r\n]', pendiente + bloque)
+            pendiente = lineas.pop()
+            for linea in lineas:
+                coincidencia = PATRON_PROGRESO.search(linea)
+                if coincidencia:
+                    etiqueta = coincidencia.group(1).decode() if coincidencia.group(1) else None
+                    al_progresar(nombre, int(coincidencia.group(2)), int(coincidencia.group(3)), etiqueta)
+
+def _ultimas_lineas(archivo_log, n=10):
+    """Últimas líneas de un log, para mostrar en caso de error."""
+    with open(archivo_log, "r", encoding="utf-8", errors="replace") as log:
+        return ''.join(log.readlines()[-n:])
+
+async def _detener(proceso, lectores):
+    """
+    Mata el grupo de procesos completo (mafft es un script que lanza sus propios
+    procesos, que heredan stdout/stderr) y vacía los logs con un tiempo límite.
+    """
+    with contextlib.suppress(ProcessLookupError):
+        os.killpg(proceso.pid, signal.SIGKILL)
+    await proceso.wait()
+    with contextlib.suppress(asyncio.TimeoutError, asyncio.CancelledError):
+        await asyncio.wait_for(lectores, ESPERA_DRENADO_S)
+
+async def ejecutar_herramienta(argv, nombre, directorio_registros="registros",
+                               timeout=None, al_progresar=None):
+    """
+    Ejecuta una herramienta externa sin shell, guardando stdout/stderr en
+    '<directorio_registros>/<nombre>.stdout.log' y '.stderr.log' mientras corre.
+    Devuelve True si terminó con código 0 dentro del tiempo límite (segundos).
+    """
+    Path(directorio_registros).mkdir(parents=True, exist_ok=True)
+    log_stdout = Path(directorio_registros) / f"{nombre}.stdout.log"
+    log_stderr = Path(directorio_registros) / f"{nombre}.stderr.log"
+
+    print(f"🔹 Ejecutando: {shlex.join(argv)}")
+    try:
+        proceso = await asyncio.create_subprocess_exec(
+            *argv, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+            start_new_session=True
+        )
+    except FileNotFoundError:
+        print(f"❌ Error al ejecutar: no se encontró '{argv[0]}'")
+        return False
+
+    lectores = asyncio.gather(
+        _transmitir(proceso.stdout, log_stdout, nombre, None),
+        _transmitir(proceso.stderr, log_stderr, nombre, al_progresar)
+    )
+    try:
+        await asyncio.wait_for(asyncio.shield(lectores), timeout)
+        codigo = await proceso.wait()
+    except asyncio.TimeoutError:
+        await _detener(proceso, lectores)
+        print(f"\n❌ Error: {nombre} superó el tiempo límite de {timeout} s")
+        return False
+    except asyncio.CancelledError:
+        # Sin esto los lectores quedan vivos con los registros abiertos
+        lectores.cancel()
+        await _detener(proceso, lectores)
+        raise
+
+    if al_progresar is not None:
+        print()
+    if codigo != 0:
+        print(f"❌ Error al ejecutar {nombre} (código {codigo})")
+        print(f"   Stderr ({log_stderr}):\n{_ultimas_lineas(log_stderr)}")
+        return False
+    return True
@@ -1,7 +1,14 @@
 # run_pipeline.py
+import argparse
+import json
 import subprocess
 import sys
+import time
 from pathlib import Path
+from archivos import escritura_atomica, hash_archivo
+from configuracion import ARCHIVO_CONFIGURACION, cargar_configuracion
+
+ARCHIVO_MANIFIESTO = "manifiesto_ejecucion.json"
 
 def ejecutar_modulo(script, descripcion):
     """Ejecuta un módulo y maneja errores."""
@@ -15,7 +22,63 @@ def ejecutar_modulo(script, descripcion):
         print(f"❌ Error en {script}: {e}")
         sys.exit(1)
 
+def archivos_etapas(config):
+    """Entradas y salidas de cada etapa, usadas para decidir si puede reanudarse."""
+    if config.get("reporte", {}).get("usar_consenso", "ugene") == "biopython":
+        consenso = config["biopython_consensus"]["archivo_salida"]
+    else:
+        consenso = config["ugene"]["archivo_salida"]
+    # La caché binaria del alineamiento la escribe la etapa 2 y la lee la cobertura del reporte
+    cache = config.get("alineamiento", {}).get("cache")
+    archivos_cache = [f"{cache}.npy", f"{cache}.ids"] if cache else []
+    return {
+        "1-Filtracion.py": {
+            "entradas": [ARCHIVO_CONFIGURACION, config["filtro"]["archivo_entrada"]],
+            "salidas": [config["filtro"]["archivo_salida"]]
+        },
+        "2-Alineamiento.py": {
+            "entradas": [ARCHIVO_CONFIGURACION, config["filtro"]["archivo_salida"]],
+            "salidas": ["alineamiento_procesado.fa", consenso, *archivos_cache]
+        },
+        "3-Reporte.py": {
+            "entradas": [ARCHIVO_CONFIGURACION, consenso, config["cebador"]["conjunto_cebadores"], *archivos_cache],
+            "salidas": [config["pdf"]["archivo_salida"]]
+        }
+    }
+
+def hashes(rutas):
+    """Hash de cada archivo, o None si no existe."""
+    return {ruta: hash_archivo(ruta) if Path(ruta).exists() else None for ruta in rutas}
+
+def cargar_manifiesto():
+    try:
+        with open(ARCHIVO_MANIFIESTO, "r", encoding="utf-8") as archivo:
+            return json.load(archivo)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"etapas": {}}
+
+def guardar_manifiesto(manifiesto):
+    with escritura_atomica(ARCHIVO_MANIFIESTO) as archivo:
+        json.dump(manifiesto, archivo, indent=2, ensure_ascii=False)
+
+def etapa_vigente(registro, archivos):
+    """
+    Una etapa se puede omitir si se completó con las mismas entradas y sus
+    salidas siguen en disco sin cambios.
+    """
+    if not registro:
+        return False
+    if registro["entradas"] != hashes(archivos["entradas"]):
+        return False
+    salidas = hashes(archivos["salidas"])
+    return None not in salidas.values() and registro["salidas"] == salidas
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ejecuta el pipeline completo.")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continúa desde la primera etapa incompleta según el manifiesto")
+    args = parser.parse_args()
+
     # Orden de ejecución
     modulos = [
         ("1-Filtracion.py", "Filtrado de secuencias"),
@@ -29,11 +92,42 @@ if __name__ == "__main__":
             print(f"❌ Error: No se encontró {script}")
             sys.exit(1)
 
+    try:
+        archivos = archivos_etapas(cargar_configuracion())
+    except (FileNotFoundError, json.JSONDecodeError, KeyError) as e:
+        print(f"❌ Error en '{ARCHIVO_CONFIGURACION}': {e}")
+        sys.exit(1)
+
+    manifiesto = cargar_manifiesto() if args.resume else {"etapas": {}}
+    reanudando = args.resume
+
     # Ejecutar pipeline
     for script, descripcion in modulos:
+        # Al reejecutar una etapa, todas las siguientes se reejecutan también
+        if reanudando and etapa_vigente(manifiesto["etapas"].get(script), archivos[script]):
+            print(f"⏭️  {descripcion}: completada en una ejecución anterior, se omite.")
+            continue
+        reanudando = False
+
+        manifiesto["etapas"].pop(script, None)
+        entradas = hashes(archivos[script]["entradas"])
+        inicio = time.time()
         if not ejecutar_modulo(script, descripcion):
             sys.exit(1)
+        # Salidas que no existen o que quedaron de una ejecución anterior
+        salidas = hashes(archivos[script]["salidas"])
+        faltantes = [ruta for ruta, valor in salidas.items()
+                     if valor is None or Path(ruta).stat().st_mtime < inicio]
+        if faltantes:
+            print(f"❌ Error: {descripcion} no generó {faltantes}")
+            sys.exit(1)
+        manifiesto["etapas"][script] = {
+            "entradas": entradas,
+            "salidas": salidas,
+            "completada": time.strftime("%Y-%m-%d %H:%M:%S")
+        }
+        guardar_manifiesto(manifiesto)
 
     print("\n" + "="*50)
     print("Modulos ejecutados exitosamente. Verifique los resultados.")
-    print("="*50)
\ No newline at end of file
+    print("="*50)
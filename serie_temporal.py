@@ -0,0 +1,145 @@
+import csv
+import sys
+from pathlib import Path
+from alineamiento import Alineamiento, consenso_levitsky
+from archivos import escritura_atomica
+from cabeceras import LectorCabeceras
+from configuracion import cargar_configuracion
+from etapas import cargar_etapa
+
+def clave_mes(fecha):
+    """(año, mes) de una fecha normalizada 'YYYY-MM-DD', o None si no tiene mes."""
+    if fecha is None:
+        return None
+    año, mes = int(fecha[:4]), int(fecha[5:7])
+    return (año, mes) if mes else None
+
+def siguiente_mes(año, mes):
+    return (año + 1, 1) if mes == 12 else (año, mes + 1)
+
+def fechas_desde_metadatos(ruta):
+    """{id: fecha} desde la tabla de metadatos de la etapa de filtrado ({} si no existe)."""
+    if not ruta or not Path(ruta).exists():
+        return {}
+    with open(ruta, "r", newline="", encoding="utf-8") as archivo:
+        return {fila["id"]: fila["fecha"] or None for fila in csv.DictReader(archivo)}
+
+def extractor_fechas(config):
+    """
+    Función id → fecha normalizada. Usa la fecha que la etapa de filtrado leyó
+    de la cabecera completa; para IDs que no están en la tabla, lee el propio ID
+    con el esquema de cabecera configurado.
+    """
+    fechas = fechas_desde_metadatos(config["filtro"].get("archivo_metadatos"))
+    lector = LectorCabeceras.desde_config(config)
+
+    def extraer_fecha(id_secuencia):
+        if id_secuencia in fechas:
+            return fechas[id_secuencia]
+        return lector.leer(id_secuencia)["fecha"]
+
+    return extraer_fecha
+
+def conteos_mensuales(alineamiento, extraer_fecha):
+    """
+    Tabla de conteos por columna de cada mes presente en el alineamiento,
+    en orden cronológico y sin huecos (los meses sin secuencias quedan en cero).
+    Cada secuencia se cuenta una sola vez.
+    """
+    filas_por_mes = {}
+    for indice, id_secuencia in enumerate(alineamiento.ids):
+        mes = clave_mes(extraer_fecha(id_secuencia))
+        if mes is not None:
+            filas_por_mes.setdefault(mes, []).append(indice)
+    if not filas_por_mes:
+        return []
+
+    vacio = alineamiento.conteos_columnas(filas=[])
+    meses = []
+    actual, ultimo = min(filas_por_mes), max(filas_por_mes)
+    while actual <= ultimo:
+        filas = filas_por_mes.get(actual)
+        meses.append((actual, alineamiento.conteos_columnas(filas=filas) if filas else vacio))
+        actual = siguiente_mes(*actual)
+    return meses
+
+def ventanas_deslizantes(meses, ventana):
+    """
+    Genera (mes_inicio, mes_fin, conteos) para cada ventana de 'ventana' meses.
+    Cada ventana se obtiene de la anterior sumando el mes que entra y restando
+    el que sale, sin volver a contar el alineamiento.
+    """
+    if len(meses) < ventana:
+        return
+    acumulado = sum(conteos for _, conteos in meses[:ventana])
+    yield meses[0][0], meses[ventana - 1][0], acumulado.copy()
+    for i in range(ventana, len(meses)):
+        acumulado += meses[i][1] - meses[i - ventana][1]
+        yield meses[i - ventana + 1][0], meses[i][0], acumulado.copy()
+
+def cargar_alineamiento(config):
+    """
+    Alineamiento recortado: 'serie_temporal.alineamiento' si se indica; si no,
+    la caché binaria de la etapa de alineamiento (si existe) o el FASTA por defecto.
+    """
+    explicito = config.get("serie_temporal", {}).get("alineamiento")
+    if explicito:
+        return Alineamiento.desde_fasta(explicito)
+    cache = config.get("alineamiento", {}).get("cache")
+    if cache and Path(f"{cache}.npy").exists():
+        return Alineamiento.desde_cache(cache)
+    return Alineamiento.desde_fasta("alineamiento_procesado.fa")
+
+def ejecutar_serie_temporal(config):
+    """
+    Consenso Levitsky y puntaje de cada set de cebadores por mes (o ventana
+    móvil de 'serie_temporal.ventana_meses' meses) a partir de un solo alineamiento.
+    """
+    reporte = cargar_etapa("reporte")
+
+    params = config.get("serie_temporal", {})
+    ventana = params.get("ventana_meses", 1)
+    archivo_consensos = params.get("archivo_consensos", "serie_consensos.fasta")
+    archivo_puntajes = params.get("archivo_puntajes", "serie_puntajes.csv")
+    umbral = config["biopython_consensus"].get("umbral", 0.6)
+    ignorar_gaps = config["biopython_consensus"].get("ignorar_gaps", True)
+
+    alineamiento = cargar_alineamiento(config)
+    meses = conteos_mensuales(alineamiento, extractor_fechas(config))
+    if not meses:
+        print("❌ Error: Ninguna secuencia del alineamiento tiene fecha con mes")
+        return False
+    print(f"🔹 {len(alineamiento)} secuencias en {len(meses)} meses (ventana de {ventana} mes(es))")
+
+    sets = [s for s in reporte.read_cebador_sets(config["cebador"]["conjunto_cebadores"]) if len(s) >= 3]
+
+    n_ventanas = 0
+    with escritura_atomica(archivo_consensos) as fasta, escritura_atomica(archivo_puntajes, newline="") as tabla:
+        escritor = csv.writer(tabla)
+        escritor.writerow(["inicio", "fin", "n_secuencias", "set", "puntaje_total",
+                           "directo", "sonda", "reverso", "pos_directo", "pos_reverso"])
+        for inicio, fin, conteos in ventanas_deslizantes(meses, ventana):
+            etiqueta_inicio, etiqueta_fin = f"{inicio[0]}-{inicio[1]:02d}", f"{fin[0]}-{fin[1]:02d}"
+            n_secuencias = int(conteos[:, 0].sum())
+            if n_secuencias == 0:
+                print(f"⚠️  {etiqueta_inicio}..{etiqueta_fin}: sin secuencias")
+                continue
+
+            consenso = consenso_levitsky(conteos, umbral, ignorar_gaps)
+            fasta.write(f">consenso_{etiqueta_inicio}_{etiqueta_fin}_n{n_secuencias}\n{consenso}\n")
+
+            for primer_set in sets:
+                resultado = reporte.find_best_match_for_set(consenso, primer_set, config)
+                puntajes = [f"{resultado[k]['puntaje']:.4f}" if resultado.get(k) else "" for k in ['directo', 'sonda', 'reverso']]
+                posiciones = resultado['posiciones'] or ("", "")
+                escritor.writerow([etiqueta_inicio, etiqueta_fin, n_secuencias, primer_set[0],
+                                   f"{resultado['puntaje_total']:.4f}", *puntajes, *posiciones])
+            n_ventanas += 1
+            print(f"✅ {etiqueta_inicio}..{etiqueta_fin}: {n_secuencias} secuencias")
+
+    print(f"\n✅ Serie temporal: {n_ventanas} consensos en '{archivo_consensos}', puntajes en '{archivo_puntajes}'")
+    return True
+
+if __name__ == "__main__":
+    if not ejecutar_serie_temporal(cargar_configuracion()):
+        sys.exit(1)
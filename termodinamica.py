@@ -0,0 +1,136 @@
+import math
+from functools import lru_cache
+
+# -------------------------------------------------
+# PARÁMETROS NEAREST-NEIGHBOUR (SantaLucia, 1998)
+# -------------------------------------------------
+# ΔH en kcal/mol y ΔS en cal/(K·mol) para cada dinucleótido 5'→3' del cebador
+# apareado con su complemento perfecto.
+NN_PARAMETROS = {
+    'AA': (-7.9, -22.2), 'TT': (-7.9, -22.2),
+    'AT': (-7.2, -20.4), 'TA': (-7.2, -21.3),
+    'CA': (-8.5, -22.7), 'TG': (-8.5, -22.7),
+    'GT': (-8.4, -22.4), 'AC': (-8.4, -22.4),
+    'CT': (-7.8, -21.0), 'AG': (-7.8, -21.0),
+    'GA': (-8.2, -22.2), 'TC': (-8.2, -22.2),
+    'CG': (-10.6, -27.2), 'GC': (-9.8, -24.4),
+    'GG': (-8.0, -19.9), 'CC': (-8.0, -19.9),
+}
+# Iniciación por extremo del dúplex, según el par terminal (G·C o A·T)
+INICIACION_GC = (0.1, -2.8)
+INICIACION_AT = (2.3, 4.1)
+# Entradas de las cachés de dúplex (el barrido de la serie temporal repite ventanas)
+MAX_CACHE_DUPLEX = 1 << 16
+R = 1.987  # cal/(K·mol)
+T37 = 310.15
+
+IUPAC = {
+    'A': 'A', 'C': 'C', 'G': 'G', 'T': 'T',
+    'R': 'AG', 'Y': 'CT', 'S': 'CG', 'W': 'AT',
+    'K': 'GT', 'M': 'AC', 'B': 'CGT',
+    'D': 'AGT', 'H': 'ACT', 'V': 'ACG',
+    'N': 'ACGT'
+}
+CODIGOS = list(IUPAC)
+INDICE = {codigo: i for i, codigo in enumerate(CODIGOS)}
+BASES = 'ACGT'
+
+def _tabla_pareos():
+    """
+    Probabilidad de que cada código del cebador forme un par con cada base
+    concreta frente a cada código del blanco, suponiendo que las variantes de
+    ambos códigos son equiprobables: una ambigüedad es un pareo parcial.
+    """
+    tabla = [[None] * len(CODIGOS) for _ in CODIGOS]
+    for a in CODIGOS:
+        for b in CODIGOS:
+            variantes = len(IUPAC[a]) * len(IUPAC[b])
+            tabla[INDICE[a]][INDICE[b]] = tuple(
+                (x in IUPAC[a] and x in IUPAC[b]) / variantes for x in BASES
+            )
+    return tabla
+
+def _tabla_perfecta():
+    """Pareo de cada código del cebador frente al complemento de cada una de sus variantes."""
+    return [tuple((x in IUPAC[c]) / len(IUPAC[c]) for x in BASES) for c in CODIGOS]
+
+SIN_PAREO = (0.0,) * len(BASES)
+PAREOS = _tabla_pareos()
+PAREOS_PERFECTOS = _tabla_perfecta()
+NN_DH = [[NN_PARAMETROS[x + y][0] for y in BASES] for x in BASES]
+NN_DS = [[NN_PARAMETROS[x + y][1] for y in BASES] for x in BASES]
+
+# -------------------------------------------------
+# CÁLCULO DE ΔG / Tm
+# -------------------------------------------------
+def _pareos(cebador, ventana):
+    """Probabilidad de pareo por base (A, C, G, T) en cada posición del dúplex."""
+    pareos = []
+    for p, t in zip(cebador, ventana):
+        if p in INDICE and t in INDICE:
+            pareos.append(PAREOS[INDICE[p]][INDICE[t]])
+        else:
+            pareos.append(SIN_PAREO)
+    return pareos
+
+def _entalpia_entropia(pareos):
+    """
+    Suma el valor esperado de los apilamientos nearest-neighbour del dúplex.
+    Un apilamiento que involucra un desapareamiento se pierde completo
+    (aproximación de apilamiento roto, sin parámetros de mismatch específicos).
+    """
+    dh, ds = 0.0, 0.0
+    for x, y in zip(pareos, pareos[1:]):
+        for i, px in enumerate(x):
+            if not px:
+                continue
+            for j, py in enumerate(y):
+                if py:
+                    dh += px * py * NN_DH[i][j]
+                    ds += px * py * NN_DS[i][j]
+    # Cada extremo aporta la iniciación G·C o A·T, ponderada por la probabilidad de A·T
+    for extremo in (pareos[0], pareos[-1]):
+        fraccion_at = extremo[0] + extremo[3]
+        dh += INICIACION_GC[0] * (1 - fraccion_at) + INICIACION_AT[0] * fraccion_at
+        ds += INICIACION_GC[1] * (1 - fraccion_at) + INICIACION_AT[1] * fraccion_at
+    return dh, ds
+
+def _duplex(pareos, na_mM, cebador_nM):
+    """(ΔG37, Tm) a partir de las probabilidades de pareo por posición."""
+    if len(pareos) < 2 or all(p == SIN_PAREO for p in pareos):
+        return 0.0, None
+
+    dh, ds = _entalpia_entropia(pareos)
+    # Corrección por sal sobre la entropía
+    ds += 0.368 * (len(pareos) - 1) * math.log(na_mM / 1000)
+
+    dg = dh - T37 * ds / 1000
+    denominador = ds + R * math.log(cebador_nM * 1e-9 / 4)
+    tm = dh * 1000 / denominador - 273.15 if dh < 0 and denominador < 0 else None
+    return dg, tm
+
+@lru_cache(maxsize=MAX_CACHE_DUPLEX)
+def calcular_duplex(cebador, ventana, na_mM=50.0, cebador_nM=250.0):
+    """
+    Devuelve (ΔG37 en kcal/mol, Tm en °C) del dúplex cebador/ventana.
+    Memoizado por (cebador, ventana), ya que el barrido repite ventanas.
+    """
+    return _duplex(_pareos(cebador, ventana), na_mM, cebador_nM)
+
+@lru_cache(maxsize=MAX_CACHE_DUPLEX)
+def duplex_perfecto(cebador, na_mM=50.0, cebador_nM=250.0):
+    """(ΔG37, Tm) del cebador frente al complemento exacto de cada una de sus variantes."""
+    pareos = [PAREOS_PERFECTOS[INDICE[p]] if p in INDICE else SIN_PAREO for p in cebador]
+    return _duplex(pareos, na_mM, cebador_nM)
+
+def puntaje_termodinamico(cebador, ventana, na_mM=50.0, cebador_nM=250.0):
+    """
+    Fracción de la estabilidad del dúplex perfecto que conserva la ventana (0-1),
+    junto con ΔG37 y Tm del dúplex real.
+    """
+    dg, tm = calcular_duplex(cebador, ventana, na_mM, cebador_nM)
+    dg_perfecto, _ = duplex_perfecto(cebador, na_mM, cebador_nM)
+    if dg_perfecto >= 0:
+        return 0.0, dg, tm
+    fraccion = max(0.0, min(1.0, dg / dg_perfecto))
+    return fraccion, dg, tm
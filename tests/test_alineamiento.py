@@ -0,0 +1,20 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from alineamiento import Alineamiento, consenso_levitsky
+
+def alineamiento_de(*secuencias):
+    matriz = np.array([np.frombuffer(s.encode(), dtype=np.uint8) for s in secuencias])
+    return Alineamiento([str(i) for i in range(len(secuencias))], matriz)
+
+def test_n_literal_es_dato_faltante():
+    alineamiento = alineamiento_de("A", "N", "N", "C", "N")
+    assert consenso_levitsky(alineamiento.conteos_columnas(), 0.5) == "M"
+
+def test_otras_ambiguedades_cuentan_en_el_total():
+    alineamiento = alineamiento_de("A", "A", "C", "R", "R")
+    assert consenso_levitsky(alineamiento.conteos_columnas(), 0.6) == "M"
@@ -0,0 +1,20 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from archivos import publicar_si, ruta_temporal
+
+def test_publicar_si_sin_temporal_no_publica(tmp_path):
+    ruta = tmp_path / "consenso.fasta"
+    assert not publicar_si(True, ruta_temporal(ruta), ruta)
+    assert not ruta.exists()
+
+def test_publicar_si_reemplaza_la_salida(tmp_path):
+    ruta = tmp_path / "consenso.fasta"
+    ruta.write_text("viejo")
+    temporal = ruta_temporal(ruta)
+    Path(temporal).write_text("nuevo")
+    assert publicar_si(True, temporal, ruta)
+    assert ruta.read_text() == "nuevo"
+    assert not Path(temporal).exists()
@@ -0,0 +1,24 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cola_trabajos import ColaSQLite
+
+def test_renovar_tras_cambiar_de_directorio(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cola = ColaSQLite("cola_trabajos.sqlite")
+    id_trabajo = cola.encolar({"segmento": "4", "periodo": 2023})
+
+    reclamado = cola.reclamar("trabajador-1", 600)
+    assert reclamado == (id_trabajo, {"segmento": "4", "periodo": 2023})
+
+    directorio = tmp_path / "trabajos" / f"trabajo_{id_trabajo}"
+    directorio.mkdir(parents=True)
+    os.chdir(directorio)
+
+    assert cola.renovar(id_trabajo, "trabajador-1", 600)
+    assert not (directorio / "cola_trabajos.sqlite").exists()
+    assert cola.reclamar("trabajador-2", 600) is None
+    assert cola.completar(id_trabajo, "trabajador-1", {"set": "x"})
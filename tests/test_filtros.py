@@ -0,0 +1,50 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from filtros import _ordenar, compilar_filtros, cumple
+
+def acepta(criterios, fecha, etiqueta=">A/Chile/1/2020", año=None, mes=None, **campos):
+    cabecera, _ = compilar_filtros(año, mes, criterios)
+    return cumple(cabecera, etiqueta, {"fecha": fecha, **campos})
+
+def test_predicados_ordenados_por_costo():
+    caro, medio, barato = object(), object(), object()
+    assert _ordenar([(2, caro), (0, barato), (1, medio)]) == [barato, medio, caro]
+
+def test_sin_fecha_se_descarta_antes_de_leer_la_fecha():
+    # Si el filtro de año corriera antes, int(None[:4]) lanzaría TypeError
+    assert not acepta({}, None, año=2020, mes=3)
+
+def test_periodo_y_meses():
+    assert acepta({}, "2020-03-15", año=2020, mes=3)
+    assert not acepta({}, "2020-04-15", año=2020, mes=3)
+    assert acepta({"meses": [1, 3]}, "2021-03-02")
+    assert not acepta({"meses": [1, 3]}, "2021-02-02")
+
+def test_limites_de_rango_de_fechas():
+    criterios = {"fecha_desde": "2020-03", "fecha_hasta": "2020-05"}
+    # "00" rellena el límite inferior y "99" el superior: el mes completo queda dentro
+    assert acepta(criterios, "2020-03-00")
+    assert acepta(criterios, "2020-03-01")
+    assert acepta(criterios, "2020-05-31")
+    assert not acepta(criterios, "2020-02-29")
+    assert not acepta(criterios, "2020-06-00")
+    assert acepta({"fecha_desde": "2020", "fecha_hasta": "2020"}, "2020-00-00")
+    assert acepta({"fecha_desde": "2020/3/5"}, "2020-03-05")
+    assert not acepta({"fecha_desde": "2020/3/5"}, "2020-03-04")
+
+def test_listas_de_ids():
+    permitidos = {"ids_permitidos": ["EPI_ISL_1", "A/Chile/2/2020"]}
+    assert acepta(permitidos, "2020-01-01", id_aislamiento="EPI_ISL_1")
+    assert acepta(permitidos, "2020-01-01", etiqueta=">A/Chile/2/2020")
+    assert not acepta(permitidos, "2020-01-01", id_aislamiento="EPI_ISL_9")
+
+    excluidos = {"ids_excluidos": ["EPI_ISL_1"]}
+    assert not acepta(excluidos, "2020-01-01", id_aislamiento="EPI_ISL_1")
+    assert acepta(excluidos, "2020-01-01", id_aislamiento="EPI_ISL_9")
+
+def test_listas_de_ids_vacias_no_filtran():
+    assert acepta({"ids_permitidos": []}, "2020-01-01")
+    assert acepta({"ids_excluidos": []}, "2020-01-01")
@@ -0,0 +1,19 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from herramientas import ejecutar_herramienta
+
+def test_tiempo_limite_mata_los_procesos_hijos(tmp_path):
+    # Igual que mafft: un script que deja a un proceso hijo con stdout/stderr abiertos
+    envoltorio = tmp_path / "envoltorio.sh"
+    envoltorio.write_text("#!/bin/sh\nsleep 30\n")
+    envoltorio.chmod(0o755)
+
+    inicio = time.monotonic()
+    ok = asyncio.run(ejecutar_herramienta([str(envoltorio)], "envoltorio", tmp_path / "registros", timeout=1))
+    assert not ok
+    assert time.monotonic() - inicio < 5
@@ -0,0 +1,28 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from alineamiento import Alineamiento
+from serie_temporal import conteos_mensuales, ventanas_deslizantes
+
+FECHAS = {
+    "s0": "2020-11-03", "s1": "2020-11-20", "s2": "2020-12-01",
+    "s3": "2021-02-14", "s4": "2021-03-09", "s5": "2021-03-30", "s6": None
+}
+
+def test_ventanas_deslizantes_igual_a_reconteo_directo():
+    rng = np.random.default_rng(0)
+    matriz = rng.choice(np.frombuffer(b"ACGT-NR", dtype=np.uint8), size=(len(FECHAS), 30))
+    alineamiento = Alineamiento(list(FECHAS), matriz)
+    meses = conteos_mensuales(alineamiento, FECHAS.get)
+    assert [mes for mes, _ in meses] == [(2020, 11), (2020, 12), (2021, 1), (2021, 2), (2021, 3)]
+
+    ventanas = list(ventanas_deslizantes(meses, 3))
+    assert len(ventanas) == 3
+    for inicio, fin, conteos in ventanas:
+        filas = [i for i, fecha in enumerate(FECHAS.values())
+                 if fecha and inicio <= (int(fecha[:4]), int(fecha[5:7])) <= fin]
+        np.testing.assert_array_equal(conteos, alineamiento.conteos_columnas(filas=filas))
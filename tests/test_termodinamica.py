@@ -0,0 +1,28 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from termodinamica import _entalpia_entropia, _pareos, calcular_duplex, puntaje_termodinamico
+
+CEBADOR = "ACGTACGTACGTACGTACGT"
+
+def test_ambiguedad_del_blanco_no_es_pareo_seguro():
+    perfecto, _, _ = puntaje_termodinamico(CEBADOR, CEBADOR)
+    con_n, _, _ = puntaje_termodinamico(CEBADOR, CEBADOR[:10] + "N" + CEBADOR[11:])
+    todo_n, _, _ = puntaje_termodinamico(CEBADOR, "N" * len(CEBADOR))
+    assert perfecto == 1.0
+    assert con_n < perfecto
+    assert todo_n < 0.5
+
+def test_duplex_conocido():
+    # SantaLucia (1998): iniciación A·T en ambos extremos
+    cebador = "TATTATGCAGAAAATCTACT"
+    dh, ds = _entalpia_entropia(_pareos(cebador, cebador))
+    assert dh == pytest.approx(-145.2)
+    assert ds == pytest.approx(-405.3)
+    dg, tm = calcular_duplex(cebador, cebador)
+    assert dg == pytest.approx(-13.0, abs=0.01)
+    assert tm == pytest.approx(43.0, abs=0.1)
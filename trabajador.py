@@ -0,0 +1,145 @@
+import argparse
+import contextlib
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+from cola_trabajos import ColaSQLite
+from configuracion import cargar_configuracion
+from etapas import cargar_etapa
+
+def parametros_cola(config):
+    """Sección 'cola' de parametros.json con valores por defecto."""
+    cola = config.get("cola", {})
+    return {
+        'ruta': cola.get("ruta", "cola_trabajos.sqlite"),
+        'directorio_trabajos': cola.get("directorio_trabajos", "trabajos"),
+        'arriendo_s': cola.get("arriendo_s", 600),
+        'max_intentos': cola.get("max_intentos", 3),
+        'espera_s': cola.get("espera_s", 10)
+    }
+
+def configuracion_trabajo(config, trabajo):
+    """Configuración de la ejecución con los parámetros propios del trabajo."""
+    filtro = {"archivo_entrada": str(Path(trabajo["archivo_entrada"]).resolve()),
+              "periodo": trabajo["periodo"], "mes": trabajo.get("mes")}
+    cambios = {"filtro": filtro,
+               "cebador": {"conjunto_cebadores": str(Path(trabajo["conjunto_cebadores"]).resolve())}}
+    return config.con_cambios(cambios)
+
+def ejecutar_trabajo(config, trabajo, directorio):
+    """
+    Ejecuta las tres etapas del pipeline dentro de 'directorio', de modo que
+    los archivos intermedios de trabajos distintos no se mezclen.
+    Devuelve el resumen del mejor set de cebadores.
+    """
+    config = configuracion_trabajo(config, trabajo)
+    Path(directorio).mkdir(parents=True, exist_ok=True)
+    with contextlib.chdir(directorio):
+        cargar_etapa("filtrado").ejecutar_filtrado(config)
+        if not cargar_etapa("alineamiento").ejecutar_alineamiento(config):
+            raise RuntimeError("falló la etapa de alineamiento")
+        mejor = cargar_etapa("reporte").main(config)
+        if mejor is None:
+            raise RuntimeError("falló la etapa de reporte")
+
+    return {
+        'directorio': str(Path(directorio).resolve()),
+        'set': mejor['set_name'],
+        'puntaje_total': mejor['puntaje_total'],
+        'pdf': config["pdf"]["archivo_salida"]
+    }
+
+def renovar_periodicamente(cola, id_trabajo, trabajador, arriendo_s, detener):
+    """Mantiene vivo el arriendo mientras el trabajo corre (latido)."""
+    while not detener.wait(arriendo_s / 3):
+        try:
+            if not cola.renovar(id_trabajo, trabajador, arriendo_s):
+                print(f"\n⚠️  El arriendo del trabajo {id_trabajo} ya no pertenece a {trabajador}.")
+                return
+        except Exception as e:
+            # Un error puntual (p. ej. base bloqueada) no debe detener el latido
+            print(f"\n⚠️  No se pudo renovar el arriendo del trabajo {id_trabajo}: {str(e)}")
+
+def ejecutar_trabajador(config, una_vez=False):
+    """Toma trabajos de la cola hasta vaciarla (una_vez) o indefinidamente."""
+    params = parametros_cola(config)
+    cola = ColaSQLite(params['ruta'])
+    trabajador = f"{socket.gethostname()}-{os.getpid()}"
+    print(f"🔹 Trabajador {trabajador} usando la cola '{params['ruta']}'")
+
+    while True:
+        reclamado = cola.reclamar(trabajador, params['arriendo_s'])
+        if reclamado is None:
+            if una_vez:
+                print("✅ No hay más trabajos pendientes.")
+                return
+            time.sleep(params['espera_s'])
+            continue
+
+        id_trabajo, trabajo = reclamado
+        print(f"\n{'='*50}\n🔹 Trabajo {id_trabajo}: {trabajo}\n{'='*50}")
+        detener = threading.Event()
+        latido = threading.Thread(
+            target=renovar_periodicamente,
+            args=(cola, id_trabajo, trabajador, params['arriendo_s'], detener),
+            daemon=True
+        )
+        latido.start()
+        try:
+            directorio = Path(params['directorio_trabajos']).resolve() / f"trabajo_{id_trabajo}"
+            resultado = ejecutar_trabajo(config, trabajo, directorio)
+            if cola.completar(id_trabajo, trabajador, resultado):
+                print(f"✅ Trabajo {id_trabajo} completado: {resultado['set']} ({resultado['puntaje_total']:.2f})")
+            else:
+                print(f"⚠️  Trabajo {id_trabajo} terminado, pero su arriendo pasó a otro trabajador.")
+        except Exception as e:
+            print(f"❌ Error en el trabajo {id_trabajo}: {str(e)}")
+            cola.fallar(id_trabajo, trabajador, e)
+        finally:
+            detener.set()
+            latido.join()
+
+def main():
+    parser = argparse.ArgumentParser(description="Ejecución distribuida del pipeline por trabajos.")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+
+    encolar = subcomandos.add_parser("encolar", help="Agrega un trabajo a la cola")
+    encolar.add_argument("--segmento", required=True)
+    encolar.add_argument("--periodo", required=True, type=int)
+    encolar.add_argument("--mes", type=int)
+    encolar.add_argument("--entrada", required=True, help="FASTA del segmento")
+    encolar.add_argument("--cebadores", required=True, help="Tabla de sets de cebadores")
+
+    trabajar = subcomandos.add_parser("trabajar", help="Procesa trabajos de la cola")
+    trabajar.add_argument("--una-vez", action="store_true", help="Termina cuando la cola está vacía")
+
+    subcomandos.add_parser("resultados", help="Muestra el estado de los trabajos")
+
+    args = parser.parse_args()
+    config = cargar_configuracion()
+    params = parametros_cola(config)
+
+    if args.comando == "encolar":
+        trabajo = {
+            "segmento": args.segmento,
+            "periodo": args.periodo,
+            "mes": args.mes,
+            "archivo_entrada": str(Path(args.entrada).resolve()),
+            "conjunto_cebadores": str(Path(args.cebadores).resolve())
+        }
+        id_trabajo = ColaSQLite(params['ruta']).encolar(trabajo, params['max_intentos'])
+        print(f"✅ Trabajo {id_trabajo} en cola: {trabajo}")
+    elif args.comando == "trabajar":
+        ejecutar_trabajador(config, una_vez=args.una_vez)
+    else:
+        print(json.dumps(ColaSQLite(params['ruta']).resultados(), indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(130)